@@ -0,0 +1,88 @@
+"""Разбор карточек PEP из байтов ответа и из декодированной строки.
+
+Прогоняет тела сохранённых карточек из tests/fixture_data/pages через
+прежний путь (тело декодируется в str, как response.text, и передаётся
+парсеру) и через новый (байты передаются парсеру с кодировкой как есть).
+Для полного разбора BeautifulSoup и для быстрого пути extract_pep_status
+выводит процессорное время и пиковую память на одну страницу.
+
+Запуск: python bench/bytes_parse.py [--repeat N]
+"""
+import argparse
+import time
+import tracemalloc
+
+from prettytable import PrettyTable
+
+from common import PAGES_DIR
+from parsers import make_soup
+from utils import extract_pep_status
+
+
+def load_pep_bodies():
+    """Возвращает тела сохранённых карточек PEP в байтах."""
+    return [
+        page.read_bytes()
+        for page in sorted(
+            (PAGES_DIR / 'peps.python.org').glob('pep-*/index.html')
+        )
+    ]
+
+
+METHODS = (
+    ('BeautifulSoup, str', lambda body: make_soup(body.decode('utf-8'))),
+    ('BeautifulSoup, bytes', make_soup),
+    (
+        'extract_pep_status, str',
+        lambda body: extract_pep_status(body.decode('utf-8')),
+    ),
+    ('extract_pep_status, bytes', extract_pep_status),
+)
+
+
+def measure(parse, bodies, repeat):
+    """Возвращает время CPU и пиковую память на страницу."""
+    started = time.process_time()
+    for _ in range(repeat):
+        for body in bodies:
+            parse(body)
+    cpu_time = (time.process_time() - started) / (repeat * len(bodies))
+
+    peaks = []
+    for body in bodies:
+        tracemalloc.start()
+        parse(body)
+        peaks.append(tracemalloc.get_traced_memory()[1])
+        tracemalloc.stop()
+    return cpu_time, sum(peaks) / len(peaks)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+
+    bodies = load_pep_bodies()
+    for body in bodies:
+        assert extract_pep_status(body) == extract_pep_status(
+            body.decode('utf-8')
+        )
+
+    table = PrettyTable()
+    table.field_names = (
+        'Способ', 'CPU, мс/стр.', 'Пик памяти, КиБ/стр. (среднее)'
+    )
+    table.align = 'l'
+    for name, parse in METHODS:
+        cpu_time, peak = measure(parse, bodies, args.repeat)
+        table.add_row((name, f'{cpu_time * 1000:.3f}', f'{peak / 1024:.1f}'))
+    size = sum(map(len, bodies))
+    print(
+        f'Страниц: {len(bodies)} ({size / 1024:.0f} КиБ), '
+        f'повторов: {args.repeat}'
+    )
+    print(table)
+
+
+if __name__ == '__main__':
+    main()
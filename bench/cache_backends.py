@@ -0,0 +1,156 @@
+"""Бенчмарк хранилищ HTTP-кеша на прогоне режима pep по 700 карточкам.
+
+Карточки — сохранённые страницы из tests/fixture_data/pages, размноженные
+по 700 ссылкам и отдаваемые адаптером requests-mock. Для каждого хранилища
+измеряются холодный прогон (пустой кеш, все ответы записываются), тёплый
+прогон (все ответы читаются из кеша) и размер кеша на диске — без сжатия
+и с каждым доступным алгоритмом сжатия ответов. Кеш memory живёт только
+в своей сессии и не сериализует ответы, поэтому его тёплый прогон тоже
+холодный, а сжатие к нему не применяется. Кеш redis обслуживается
+fakeredis, если он установлен.
+
+Запуск:
+    python bench/cache_backends.py --workers 8
+    python bench/cache_backends.py --backend sqlite --compression zstd
+"""
+import argparse
+import contextlib
+import io
+import logging
+import os
+import re
+import tempfile
+import time
+from pathlib import Path
+
+import requests_mock
+from prettytable import PrettyTable
+
+from common import load_pep_pages
+import compression
+import sessions
+import utils
+from constants import (
+    CACHE_BACKENDS,
+    CACHE_MEMORY,
+    CACHE_REDIS,
+    COMPRESSION_LEVELS,
+    COMPRESSION_NONE,
+    COMPRESSION_ZSTD,
+    REDIS_URL,
+)
+
+try:
+    import fakeredis
+except ImportError:
+    fakeredis = None
+
+PEP_COUNT = 700
+PEP_URL = 'https://peps.python.org/pep-{:04d}/'
+
+
+def get_pep_adapter():
+    """Отдаёт по ссылкам PEP сохранённые карточки по кругу."""
+    pages = [page.encode('utf-8') for page in load_pep_pages()]
+    adapter = requests_mock.Adapter()
+    adapter.register_uri(
+        'GET', re.compile(r'https://peps\.python\.org/pep-\d+/'),
+        headers={'Content-Type': 'text/html; charset=utf-8'},
+        content=lambda request, context: pages[
+            int(request.path.strip('/').split('-')[1]) % len(pages)
+        ],
+    )
+    return adapter
+
+
+def run_pep(backend, codec, pep_links, workers):
+    """Прогоняет обработку PEP на новой сессии и возвращает время."""
+    serializer = None
+    if codec != COMPRESSION_NONE:
+        serializer = compression.create_serializer(codec)
+    session = sessions.ParserSession(
+        backend=sessions.create_cache_backend(backend, REDIS_URL, serializer)
+    )
+    session.mount('https://', get_pep_adapter())
+    started = time.perf_counter()
+    with contextlib.redirect_stderr(io.StringIO()):
+        utils.process_pep_data(session, pep_links, workers=workers)
+    elapsed = time.perf_counter() - started
+    session.close()
+    return elapsed
+
+
+def get_size(backend):
+    paths = {
+        'sqlite': Path().glob('http_cache.sqlite*'),
+        'filesystem': Path('http_cache').rglob('*'),
+    }.get(backend)
+    if paths is None:
+        return '—'
+    size = sum(path.stat().st_size for path in paths if path.is_file())
+    return round(size / 1024 ** 2, 2)
+
+
+def measure(backend, codec, pep_links, workers):
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as directory:
+        os.chdir(directory)
+        try:
+            cold = run_pep(backend, codec, pep_links, workers)
+            warm = run_pep(backend, codec, pep_links, workers)
+            size = get_size(backend)
+        finally:
+            os.chdir(cwd)
+    return backend, codec, round(cold, 3), round(warm, 3), size
+
+
+def get_variants(backends, codecs):
+    """Отдаёт пары (хранилище, сжатие), доступные в окружении."""
+    for backend in backends:
+        if backend == CACHE_REDIS and fakeredis is None:
+            continue
+        for codec in codecs:
+            if codec == COMPRESSION_ZSTD and compression.zstandard is None:
+                continue
+            if backend == CACHE_MEMORY and codec != COMPRESSION_NONE:
+                continue
+            yield backend, codec
+
+
+def main_bench():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--workers', type=int, default=1)
+    parser.add_argument(
+        '--backend', action='append', choices=CACHE_BACKENDS,
+        help='Хранилище для замера (по умолчанию все)'
+    )
+    parser.add_argument(
+        '--compression', action='append',
+        choices=(COMPRESSION_NONE, *COMPRESSION_LEVELS),
+        help='Сжатие для замера (по умолчанию все)'
+    )
+    args = parser.parse_args()
+
+    logging.disable(logging.CRITICAL)
+    if fakeredis is not None:
+        sessions.Redis = fakeredis.FakeRedis
+    pep_links = [
+        utils.PepRecord(str(number), PEP_URL.format(number), 'S', '')
+        for number in range(1, PEP_COUNT + 1)
+    ]
+    table = PrettyTable()
+    table.field_names = (
+        'Хранилище', 'Сжатие', 'Холодный, с', 'Тёплый, с', 'МиБ'
+    )
+    table.align = 'l'
+    for backend, codec in get_variants(
+        args.backend or CACHE_BACKENDS,
+        args.compression or (COMPRESSION_NONE, *COMPRESSION_LEVELS),
+    ):
+        table.add_row(measure(backend, codec, pep_links, args.workers))
+    print(f'{PEP_COUNT} карточек PEP, потоков: {args.workers}')
+    print(table)
+
+
+if __name__ == '__main__':
+    main_bench()
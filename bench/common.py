@@ -0,0 +1,61 @@
+"""Общие пути и данные для бенчмарков и тестов.
+
+Импорт модуля добавляет src в sys.path, чтобы бенчмарки запускались
+командой python bench/<имя>.py из корня репозитория.
+"""
+import mimetypes
+import sys
+from pathlib import Path
+
+import requests
+import requests_mock
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+SRC_DIR = BASE_DIR / 'src'
+PAGES_DIR = BASE_DIR / 'tests' / 'fixture_data' / 'pages'
+
+if str(SRC_DIR) not in sys.path:
+    sys.path.append(str(SRC_DIR))
+
+
+def load_pep_pages():
+    """Возвращает HTML-код сохранённых карточек PEP."""
+    return [
+        page.read_text(encoding='utf-8')
+        for page in sorted(
+            (PAGES_DIR / 'peps.python.org').glob('pep-*/index.html')
+        )
+    ]
+
+
+def saved_pages():
+    """Отдаёт (url, заголовки, тело) сохранённых страниц."""
+    for page in sorted(PAGES_DIR.rglob('*')):
+        if not page.is_file():
+            continue
+        path = page.relative_to(PAGES_DIR).as_posix()
+        if page.name == 'index.html':
+            path = path[:-len(page.name)]
+        content_type, _ = mimetypes.guess_type(page.name)
+        if content_type == 'text/html':
+            content_type += '; charset=utf-8'
+        yield (
+            'https://' + path,
+            {'Content-Type': content_type},
+            page.read_bytes(),
+        )
+
+
+def get_pages_adapter():
+    """Адаптер requests, отдающий сохранённые страницы по их ссылкам."""
+    adapter = requests_mock.Adapter()
+    for url, headers, body in saved_pages():
+        adapter.register_uri('GET', url, headers=headers, content=body)
+    return adapter
+
+
+def create_replay_session(session=None):
+    """Подключает к сессии адаптер с сохранёнными страницами."""
+    session = session or requests.Session()
+    session.mount('https://', get_pages_adapter())
+    return session
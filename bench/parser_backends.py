@@ -0,0 +1,64 @@
+"""Сравнение библиотек разбора HTML (--parser) на сценариях bench/run.py.
+
+Для каждой установленной библиотеки прогоняются сценарии run.py на
+сохранённых страницах и выводятся пропускная способность и задержка на
+страницу. Результаты сценария сверяются с результатами bs4.
+
+Запуск:
+    python bench/parser_backends.py
+    python bench/parser_backends.py --repeat 10 --scenario parse_pep_list
+"""
+import argparse
+import contextlib
+import io
+import logging
+from importlib.util import find_spec
+
+from prettytable import PrettyTable
+
+from common import create_replay_session
+import parsers
+from constants import PARSER_BS4, PARSERS
+from run import SCENARIOS, measure
+
+
+def run_scenario(scenario):
+    """Возвращает результат сценария на новой сессии."""
+    with contextlib.redirect_stderr(io.StringIO()):
+        return scenario(create_replay_session())
+
+
+def main_bench():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument(
+        '--scenario', action='append', choices=SCENARIOS,
+        help='Сценарий для запуска (по умолчанию все)'
+    )
+    args = parser.parse_args()
+
+    logging.disable(logging.CRITICAL)
+    names = args.scenario or list(SCENARIOS)
+    expected = {name: run_scenario(SCENARIOS[name]) for name in names}
+    table = PrettyTable()
+    table.field_names = ('Парсер', 'Сценарий', 'Стр./с', 'мс/стр.', 'CPU, с')
+    table.align = 'l'
+    for parser_name in PARSERS:
+        if find_spec(parsers.PARSER_PACKAGES[parser_name]) is None:
+            continue
+        parsers.set_parser(parser_name)
+        for name in names:
+            assert run_scenario(SCENARIOS[name]) == expected[name], (
+                f'{parser_name}: результат {name} отличается от bs4'
+            )
+            result = measure(SCENARIOS[name], args.repeat)
+            table.add_row((
+                parser_name, name, result['pages_per_s'],
+                result['page_latency_ms'], result['cpu_s'],
+            ))
+    parsers.set_parser(PARSER_BS4)
+    print(table)
+
+
+if __name__ == '__main__':
+    main_bench()
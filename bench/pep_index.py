@@ -0,0 +1,117 @@
+"""Разбор индекса PEP: обход дерева BeautifulSoup и extract_pep_records.
+
+Индекс синтетический: в разделе index-by-category одна таблица с --rows
+строками, после него — числовой индекс с теми же строками, как на
+peps.python.org. Прежний способ строит дерево BeautifulSoup и ищет
+строки, ячейки, <abbr> и <a> через find_all/find; новый разбирает
+страницу один раз через lxml.etree.iterparse. Для каждого размера
+выводятся время и пиковая память. Результаты способов сверяются на
+синтетических индексах и на сохранённом индексе из tests/fixture_data.
+
+Запуск:
+    python bench/pep_index.py
+    python bench/pep_index.py --rows 1000 --rows 10000 --rows 30000
+"""
+import argparse
+import time
+import tracemalloc
+from urllib.parse import urljoin
+
+from prettytable import PrettyTable
+
+from common import PAGES_DIR
+from parsers import make_soup
+from utils import PEP_DOC_URL, extract_pep_records
+
+ROW = (
+    '<tr class="row-odd"><td><p><abbr title="Standards Track, Accepted">'
+    'SA</abbr></p></td>\n<td><p><a class="pep reference internal" '
+    'href="pep-{number:04d}/" title="PEP {number} – Title">{number}</a>'
+    '</p></td>\n<td><p><a class="pep reference internal" '
+    'href="pep-{number:04d}/" title="PEP {number} – Title">Title of '
+    'PEP {number}</a></p></td>\n<td><p>Author Name</p></td>\n</tr>\n'
+)
+TABLE = (
+    '<table class="pep-zero-table docutils align-default"><thead>'
+    '<tr class="row-odd"><th class="head"><p></p></th>'
+    '<th class="head"><p>PEP</p></th><th class="head"><p>Title</p></th>'
+    '<th class="head"><p>Authors</p></th></tr></thead><tbody>\n'
+    '{rows}</tbody></table>'
+)
+
+
+def make_index(rows):
+    """Возвращает синтетический индекс PEP с rows строками в байтах."""
+    table = TABLE.format(rows=''.join(
+        ROW.format(number=number) for number in range(1, rows + 1)
+    ))
+    return (
+        '<!DOCTYPE html><html><head><meta charset="utf-8"></head><body>'
+        '<section id="index-by-category"><h2>Index by Category</h2>'
+        f'<section id="accepted"><h3>Accepted PEPs</h3>{table}</section>'
+        '</section>'
+        f'<section id="numerical-index"><h2>Numerical Index</h2>{table}'
+        '</section></body></html>'
+    ).encode('utf-8')
+
+
+def soup_records(html):
+    """Прежний parse_pep_list: поиск по дереву BeautifulSoup."""
+    soup = make_soup(html)
+    section = soup.find('section', attrs={'id': 'index-by-category'})
+    records = []
+    for row in section.find_all('tr')[1:]:
+        columns = row.find_all('td')
+        if not columns:
+            continue
+        pep_number = columns[1].text.strip()
+        if pep_number == '0':
+            continue
+        abbr_tag = columns[0].find('abbr')
+        abbr_text = abbr_tag.text.strip() if abbr_tag else ''
+        records.append((
+            pep_number,
+            urljoin(PEP_DOC_URL, columns[1].find('a')['href']),
+            abbr_text[:1],
+            abbr_text[1:2],
+        ))
+    return records
+
+
+def measure(extract, html):
+    """Возвращает время разбора в секундах и пиковую память в МиБ."""
+    started = time.perf_counter()
+    extract(html)
+    elapsed = time.perf_counter() - started
+    tracemalloc.start()
+    extract(html)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return elapsed, peak / 1024 ** 2
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, action='append')
+    args = parser.parse_args()
+
+    saved_index = (PAGES_DIR / 'peps.python.org' / 'index.html').read_bytes()
+    assert soup_records(saved_index) == list(extract_pep_records(saved_index))
+
+    table = PrettyTable()
+    table.field_names = ('Строк', 'Способ', 'Время, с', 'Пик памяти, МиБ')
+    table.align = 'l'
+    for rows in args.rows or (1000, 10000):
+        html = make_index(rows)
+        assert soup_records(html) == list(extract_pep_records(html))
+        for name, extract in (
+            ('BeautifulSoup, find_all', soup_records),
+            ('extract_pep_records', extract_pep_records),
+        ):
+            elapsed, peak = measure(extract, html)
+            table.add_row((rows, name, f'{elapsed:.3f}', f'{peak:.1f}'))
+    print(table)
+
+
+if __name__ == '__main__':
+    main()
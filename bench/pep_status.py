@@ -0,0 +1,64 @@
+"""Сравнение способов извлечения статуса из карточек PEP.
+
+Прогоняет сохранённые карточки из tests/fixture_data/pages через полный
+разбор BeautifulSoup и через быстрый путь utils.extract_pep_status и
+выводит процессорное время и пиковую память на одну страницу.
+
+Запуск: python bench/pep_status.py [--repeat N]
+"""
+import argparse
+import time
+import tracemalloc
+
+from bs4 import BeautifulSoup
+from prettytable import PrettyTable
+
+from common import load_pep_pages
+from utils import extract_pep_status, find_pep_status
+
+
+def full_tree(html):
+    return find_pep_status(BeautifulSoup(html, 'lxml'))
+
+
+def measure(extract, pages, repeat):
+    """Возвращает время CPU и пиковую память на страницу."""
+    started = time.process_time()
+    for _ in range(repeat):
+        for html in pages:
+            extract(html)
+    cpu_time = (time.process_time() - started) / (repeat * len(pages))
+
+    peaks = []
+    for html in pages:
+        tracemalloc.start()
+        extract(html)
+        peaks.append(tracemalloc.get_traced_memory()[1])
+        tracemalloc.stop()
+    return cpu_time, max(peaks)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+
+    pages = load_pep_pages()
+    for html in pages:
+        assert extract_pep_status(html) == full_tree(html)
+
+    table = PrettyTable()
+    table.field_names = ('Способ', 'CPU, мс/стр.', 'Пик памяти, КиБ/стр.')
+    table.align = 'l'
+    for name, extract in (
+        ('BeautifulSoup целиком', full_tree),
+        ('extract_pep_status', extract_pep_status),
+    ):
+        cpu_time, peak = measure(extract, pages, args.repeat)
+        table.add_row((name, f'{cpu_time * 1000:.3f}', f'{peak / 1024:.1f}'))
+    print(f'Страниц: {len(pages)}, повторов: {args.repeat}')
+    print(table)
+
+
+if __name__ == '__main__':
+    main()
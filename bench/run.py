@@ -0,0 +1,156 @@
+"""Бенчмарк режимов парсера на сохранённых страницах.
+
+Страницы из tests/fixture_data/pages отдаются через адаптер requests-mock,
+так что измеряется только работа парсера. Для каждого сценария выводятся
+пропускная способность, задержка на страницу и пиковая память; отчёт в JSON
+можно сохранить и сравнить с отчётом другого коммита.
+
+Запуск:
+    python bench/run.py --json report.json
+    python bench/run.py --compare report.json
+"""
+import argparse
+import contextlib
+import io
+import json
+import logging
+import platform
+import subprocess
+import time
+import tracemalloc
+from datetime import datetime
+
+from prettytable import PrettyTable
+
+from common import BASE_DIR, create_replay_session
+import main
+import utils
+
+
+def pep(session):
+    return utils.process_pep_data(session, utils.parse_pep_list(session))
+
+
+SCENARIOS = {
+    'whats-new': main.whats_new,
+    'latest-versions': main.latest_versions,
+    'pep': pep,
+    'parse_pep_list': utils.parse_pep_list,
+}
+
+
+def run_once(scenario):
+    """Запускает сценарий на новой сессии и возвращает число запросов."""
+    session = create_replay_session()
+    requested = []
+    session.hooks['response'].append(
+        lambda response, *args, **kwargs: requested.append(response.url)
+    )
+    with contextlib.redirect_stderr(io.StringIO()):
+        scenario(session)
+    return len(requested)
+
+
+def measure(scenario, repeat):
+    """Возвращает показатели сценария, усреднённые по repeat запускам."""
+    run_once(scenario)
+    wall_time = cpu_time = 0
+    pages = 0
+    for _ in range(repeat):
+        wall_started = time.perf_counter()
+        cpu_started = time.process_time()
+        pages = run_once(scenario)
+        wall_time += time.perf_counter() - wall_started
+        cpu_time += time.process_time() - cpu_started
+    wall_time /= repeat
+    cpu_time /= repeat
+
+    tracemalloc.start()
+    run_once(scenario)
+    peak_memory = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return {
+        'pages': pages,
+        'repeat': repeat,
+        'wall_s': round(wall_time, 6),
+        'cpu_s': round(cpu_time, 6),
+        'pages_per_s': round(pages / wall_time, 2),
+        'page_latency_ms': round(wall_time / pages * 1000, 3),
+        'peak_memory_kib': round(peak_memory / 1024, 1),
+    }
+
+
+def get_commit():
+    try:
+        return subprocess.run(
+            ('git', 'rev-parse', '--short', 'HEAD'),
+            cwd=BASE_DIR, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def print_report(report, baseline=None):
+    table = PrettyTable()
+    table.field_names = (
+        'Сценарий', 'Страниц', 'Стр./с', 'мс/стр.', 'CPU, с', 'Пик, КиБ'
+    )
+    if baseline:
+        table.field_names += ('Δ мс/стр.', 'Δ пик')
+    table.align = 'l'
+    for name, result in report['results'].items():
+        row = (
+            name, result['pages'], result['pages_per_s'],
+            result['page_latency_ms'], result['cpu_s'],
+            result['peak_memory_kib'],
+        )
+        if baseline:
+            old = baseline['results'].get(name)
+            row += (
+                change(old, result, 'page_latency_ms'),
+                change(old, result, 'peak_memory_kib'),
+            )
+        table.add_row(row)
+    print(table)
+
+
+def change(old, new, key):
+    if not old or not old[key]:
+        return '—'
+    return f'{(new[key] - old[key]) / old[key]:+.1%}'
+
+
+def main_bench():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument(
+        '--scenario', action='append', choices=SCENARIOS,
+        help='Сценарий для запуска (по умолчанию все)'
+    )
+    parser.add_argument('--json', help='Куда сохранить отчёт в JSON')
+    parser.add_argument('--compare', help='Отчёт в JSON для сравнения')
+    args = parser.parse_args()
+
+    logging.disable(logging.CRITICAL)
+    report = {
+        'commit': get_commit(),
+        'created_at': datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'results': {
+            name: measure(SCENARIOS[name], args.repeat)
+            for name in args.scenario or SCENARIOS
+        },
+    }
+    baseline = None
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as file:
+            baseline = json.load(file)
+        print(f'Сравнение с {baseline.get("commit")}')
+    print_report(report, baseline)
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as file:
+            json.dump(report, file, ensure_ascii=False, indent=2)
+
+
+if __name__ == '__main__':
+    main_bench()
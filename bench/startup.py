@@ -0,0 +1,146 @@
+"""Бенчмарк времени запуска CLI по данным python -X importtime.
+
+Для --help и каждого режима запускается отдельный интерпретатор с
+-X importtime. Режимы работают через main.main() на сохранённых страницах:
+сессия из create_session получает адаптер requests-mock, а импорт
+модулей, нужных только для подмены страниц, из замера исключается. Файлы
+режимов (логи, результаты, архивы) пишутся во временный каталог.
+Выводится суммарное время импорта (медиана по --repeat запускам) и
+загруженные тяжёлые зависимости.
+
+Запуск:
+    python bench/startup.py
+    python bench/startup.py --output pretty --repeat 10
+"""
+import argparse
+import statistics
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+BENCH_DIR = Path(__file__).resolve().parent
+SRC_DIR = BENCH_DIR.parent / 'src'
+TARGETS = ('help', 'whats-new', 'latest-versions', 'download', 'pep')
+HEAVY_MODULES = (
+    'aiohttp', 'bs4', 'lxml', 'prettytable', 'requests', 'requests_cache',
+    'selectolax', 'tqdm',
+)
+# Модули, которые нужны только для подмены страниц в бенчмарке.
+REPLAY_MODULES = ('common', 'requests_mock')
+
+
+def run_target(target, output=None):
+    """Запускает main.main() для цели бенчмарка в текущем каталоге."""
+    sys.path.append(str(SRC_DIR))
+    import configs
+    import main
+    import utils
+
+    directory = Path.cwd()
+    configs.BASE_LOG_DIR = directory / 'logs'
+    configs.LOG_FILE_PATH = directory / 'logs' / 'parser.log'
+    main.BASE_DIR = directory
+    main.CHECKPOINTS_DIR = directory / 'checkpoints'
+    utils.RESULTS_DIR = directory / 'results'
+    if target == 'help':
+        sys.argv = ['main.py', '--help']
+    else:
+        sys.argv = ['main.py', target, '--cache-backend', 'memory']
+        patch_create_session(directory)
+    if output:
+        sys.argv += ['--output', output]
+    try:
+        main.main()
+    except SystemExit:
+        pass
+
+
+def patch_create_session(directory):
+    """Подключает к сессиям main.main() адаптер с сохранёнными страницами."""
+    import memo
+    import sessions
+
+    create_session = sessions.create_session
+    sessions.ExtractionMemo = lambda: memo.ExtractionMemo(
+        directory / 'memo.sqlite3'
+    )
+
+    def create_replay_session(cli_args):
+        session = create_session(cli_args)
+        sys.path.append(str(BENCH_DIR))
+        from common import get_pages_adapter
+
+        session.mount('https://', get_pages_adapter())
+        return session
+
+    sessions.create_session = create_replay_session
+
+
+def parse_import_times(stderr):
+    """Разбирает вывод -X importtime в словарь {модуль: (мкс, вложенность)}.
+
+    Время — накопленное время импорта модуля вместе с его зависимостями.
+    """
+    imports = {}
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, name = line.split('|')
+        depth = (len(name) - len(name.lstrip())) // 2
+        imports[name.strip()] = (int(cumulative), depth)
+    return imports
+
+
+def measure_imports(target, output=None):
+    """Запускает цель в новом интерпретаторе и возвращает её импорты."""
+    command = [
+        sys.executable, '-X', 'importtime', __file__, '--run', target
+    ]
+    if output:
+        command += ['--output', output]
+    with tempfile.TemporaryDirectory() as directory:
+        process = subprocess.run(
+            command, cwd=directory, capture_output=True, text=True,
+            check=True,
+        )
+    return parse_import_times(process.stderr)
+
+
+def total_import_ms(imports):
+    """Суммарное время импорта без модулей подмены страниц."""
+    return sum(
+        cumulative for name, (cumulative, depth) in imports.items()
+        if depth == 0 and name not in REPLAY_MODULES
+    ) / 1000
+
+
+def main_bench():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--output', choices=('pretty', 'file'))
+    parser.add_argument('--run', choices=TARGETS, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.run:
+        run_target(args.run, args.output)
+        return
+
+    from prettytable import PrettyTable
+
+    table = PrettyTable()
+    table.field_names = ('Запуск', 'Импорт, мс', 'Тяжёлые зависимости')
+    table.align = 'l'
+    for target in TARGETS:
+        runs = [
+            measure_imports(target, args.output) for _ in range(args.repeat)
+        ]
+        table.add_row((
+            target,
+            round(statistics.median(map(total_import_ms, runs)), 1),
+            ', '.join(name for name in HEAVY_MODULES if name in runs[0]),
+        ))
+    print(table)
+
+
+if __name__ == '__main__':
+    main_bench()
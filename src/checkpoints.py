@@ -0,0 +1,66 @@
+import json
+import logging
+
+
+class Checkpoint:
+    """Журнал уже обработанных элементов долгого обхода в JSONL-файле.
+
+    Каждая запись — строка JSON [ключ, результат], дописываемая на диск
+    сразу после обработки элемента. Если обход прервётся, при запуске
+    с resume=True записи журнала загружаются в словарь done, и повторно
+    обрабатывать нужно только оставшиеся элементы. Ключи-списки
+    восстанавливаются как кортежи.
+    """
+
+    def __init__(self, path, resume=False):
+        self.path = path
+        self.resume = resume
+        self.done = {}
+        self._file = None
+
+    def __enter__(self):
+        if self.resume:
+            self.done = self._load()
+            logging.info(
+                "Контрольная точка %s: уже обработано %s",
+                self.path,
+                len(self.done)
+            )
+        self.path.parent.mkdir(exist_ok=True)
+        self._file = open(self.path, 'w', encoding='utf-8')
+        for key, value in self.done.items():
+            self._write(key, value)
+        self._file.flush()
+        return self
+
+    def __exit__(self, *exc_info):
+        self._file.close()
+
+    def _load(self):
+        done = {}
+        try:
+            with open(self.path, encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        key, value = json.loads(line)
+                    except ValueError:
+                        # Строка, оборванная при аварийном завершении.
+                        continue
+                    done[tuple(key) if isinstance(key, list) else key] = value
+        except FileNotFoundError:
+            pass
+        return done
+
+    def _write(self, key, value):
+        self._file.write(json.dumps([key, value], ensure_ascii=False) + '\n')
+
+    def add(self, key, value):
+        """Записывает результат обработки элемента в журнал."""
+        self.done[key] = value
+        self._write(key, value)
+        self._file.flush()
+
+    def remove(self):
+        """Удаляет журнал после успешного завершения обхода."""
+        self._file.close()
+        self.path.unlink(missing_ok=True)
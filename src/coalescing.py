@@ -0,0 +1,69 @@
+from collections import OrderedDict
+from concurrent.futures import Future
+from threading import Lock
+
+from constants import RESPONSE_MEMO_SIZE
+
+
+class RequestCoalescer:
+    """Память ответов на время запуска с объединением одинаковых запросов.
+
+    get(key, fetch) вызывает fetch(): запросы, пришедшие, пока первый ещё
+    выполняется, дожидаются его результата или ошибки. Ответ запоминается
+    только для ключа, запрошенного повторно (страницы индекса и «Что
+    нового», нужные нескольким режимам), и дальше берётся из памяти;
+    карточки, загружаемые за запуск один раз, в памяти не держатся.
+    Хранится не больше max_entries последних ответов; ошибки не
+    запоминаются.
+    """
+
+    def __init__(self, max_entries=RESPONSE_MEMO_SIZE):
+        self.max_entries = max_entries
+        self.hits = 0
+        self.coalesced = 0
+        self._responses = OrderedDict()
+        self._in_flight = {}
+        self._requested = set()
+        self._lock = Lock()
+
+    @property
+    def duplicates(self):
+        """Число запросов, не отправленных повторно."""
+        return self.hits + self.coalesced
+
+    def get(self, key, fetch):
+        """Возвращает ответ по ключу, вызывая fetch() только при промахе."""
+        with self._lock:
+            if key in self._responses:
+                self.hits += 1
+                self._responses.move_to_end(key)
+                return self._responses[key]
+            future = self._in_flight.get(key)
+            owner = future is None
+            if owner:
+                future = self._in_flight[key] = Future()
+            else:
+                self.coalesced += 1
+        if not owner:
+            return future.result()
+
+        try:
+            response = fetch()
+        except BaseException as error:
+            future.set_exception(error)
+            with self._lock:
+                del self._in_flight[key]
+            raise
+        with self._lock:
+            self._remember(key, response)
+            del self._in_flight[key]
+        future.set_result(response)
+        return response
+
+    def _remember(self, key, response):
+        if self.max_entries <= 0 or key not in self._requested:
+            self._requested.add(key)
+            return
+        self._responses[key] = response
+        if len(self._responses) > self.max_entries:
+            self._responses.popitem(last=False)
@@ -0,0 +1,57 @@
+import zlib
+from functools import partial
+
+from requests_cache.serializers import (
+    SerializerPipeline,
+    Stage,
+    pickle_serializer,
+)
+
+from constants import COMPRESSION_LEVELS, COMPRESSION_ZSTD
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+
+def get_codec(compression, level):
+    """Возвращает функции сжатия и распаковки данных."""
+    if compression == COMPRESSION_ZSTD:
+        if zstandard is None:
+            raise RuntimeError(
+                'Для сжатия zstd установите пакет zstandard'
+            )
+        # Объекты zstandard нельзя делить между потоками загрузки.
+        return (
+            lambda data: zstandard.ZstdCompressor(level=level).compress(data),
+            lambda data: zstandard.ZstdDecompressor().decompress(data),
+        )
+    return partial(zlib.compress, level=level), zlib.decompress
+
+
+def create_serializer(compression, level=None):
+    """Создаёт сериализатор HTTP-кеша, сжимающий сохраняемые ответы.
+
+    Ответы сериализуются pickle, как в кеше по умолчанию, и сжимаются
+    zlib или zstd с уровнем level (по умолчанию — стандартный уровень
+    алгоритма). Имя сериализатора входит в ключ кеша requests-cache, так
+    что ответы, сохранённые с другим сжатием, не читаются, а загружаются
+    заново.
+    """
+    min_level, default_level, max_level = COMPRESSION_LEVELS[compression]
+    level = default_level if level is None else level
+    if not min_level <= level <= max_level:
+        raise ValueError(
+            f'Уровень сжатия {compression} должен быть '
+            f'от {min_level} до {max_level}, получено: {level}'
+        )
+    compress, decompress = get_codec(compression, level)
+    return SerializerPipeline(
+        [
+            *pickle_serializer.copy().stages,
+            Stage(dumps=compress, loads=decompress),
+        ],
+        name=compression,
+        is_binary=True,
+    )
@@ -1,23 +1,103 @@
 import argparse
 import logging
+import math
 from logging.handlers import RotatingFileHandler
+from pathlib import Path
 
 from constants import (
     BASE_LOG_DIR,
+    CACHE_BACKENDS,
+    CACHE_SQLITE,
+    COMPRESSION_LEVELS,
+    COMPRESSION_NONE,
+    COMPRESSION_ZLIB,
+    DEFAULT_PARSE_WORKERS,
+    DEFAULT_PARSER,
+    DEFAULT_POOL_SIZE,
+    DEFAULT_RETRIES,
+    DEFAULT_TIMEOUT,
+    DEFAULT_WORKERS,
     DT_FORMAT,
+    ENGINE_ASYNC,
+    ENGINE_THREADS,
+    FILE_FORMAT_CSV,
     LOG_FORMAT,
     LOG_FILE_PATH,
     LOG_BACKUP_COUNT,
     LOG_MAX_BYTES,
     OUTPUT_FILE,
     OUTPUT_PRETTY,
+    PARSERS,
+    REDIS_URL,
+    SNAPSHOT_PATH,
 )
+from outputs import FILE_FORMAT_TO_WRITER
+
+
+def positive_int(value):
+    """Проверяет, что аргумент командной строки — целое число больше нуля."""
+    try:
+        number = int(value)
+    except ValueError:
+        number = 0
+    if number < 1:
+        raise argparse.ArgumentTypeError(
+            f'Ожидается целое число больше нуля, получено: {value}'
+        )
+    return number
+
+
+def non_negative_int(value):
+    """Проверяет, что аргумент командной строки — целое число не меньше 0."""
+    try:
+        number = int(value)
+    except ValueError:
+        number = -1
+    if number < 0:
+        raise argparse.ArgumentTypeError(
+            f'Ожидается целое число не меньше нуля, получено: {value}'
+        )
+    return number
+
+
+def positive_float(value):
+    """Проверяет, что аргумент командной строки — число больше нуля."""
+    try:
+        number = float(value)
+    except ValueError:
+        number = 0
+    if not number > 0:
+        raise argparse.ArgumentTypeError(
+            f'Ожидается число больше нуля, получено: {value}'
+        )
+    return number
+
+
+def rate_limit(value):
+    """Разбирает ограничение частоты запросов вида [HOST=]RATE[:BURST].
+
+    Возвращает кортеж (хост или None, запросов в секунду, burst).
+    """
+    host, _, limit = value.rpartition('=')
+    rate, _, burst = limit.partition(':')
+    try:
+        rate = float(rate)
+        burst = int(burst) if burst else max(1, math.ceil(rate))
+    except ValueError:
+        rate = burst = 0
+    if not rate > 0 or burst < 1:
+        raise argparse.ArgumentTypeError(
+            f'Ожидается ограничение вида [HOST=]RATE[:BURST], '
+            f'получено: {value}'
+        )
+    return host or None, rate, burst
 
 
 def configure_argument_parser(available_modes):
     parser = argparse.ArgumentParser(description='Парсер документации Python')
     parser.add_argument(
         'mode',
+        nargs='+',
         choices=available_modes,
         help='Режимы работы парсера'
     )
@@ -27,12 +107,160 @@ def configure_argument_parser(available_modes):
         action='store_true',
         help='Очистка кеша'
     )
+    parser.add_argument(
+        '--no-memo',
+        action='store_true',
+        help='Не сохранять результаты разбора страниц между запусками'
+    )
+    parser.add_argument(
+        '-r',
+        '--revalidate',
+        action='store_true',
+        help='Перепроверка кеша условными запросами'
+    )
+    parser.add_argument(
+        '--cache-backend',
+        choices=CACHE_BACKENDS,
+        default=CACHE_SQLITE,
+        help='Хранилище HTTP-кеша'
+    )
+    parser.add_argument(
+        '--cache-ttl',
+        type=positive_int,
+        metavar='SECONDS',
+        help='Время жизни ответов в HTTP-кеше (по умолчанию бессрочно)'
+    )
+    parser.add_argument(
+        '--cache-max-entries',
+        type=positive_int,
+        metavar='N',
+        help='Наибольшее число ответов в HTTP-кеше, старые удаляются'
+    )
+    parser.add_argument(
+        '--redis-url',
+        default=REDIS_URL,
+        help='Адрес Redis-совместимого сервера для кеша redis'
+    )
+    parser.add_argument(
+        '--cache-compression',
+        choices=(COMPRESSION_NONE, *COMPRESSION_LEVELS),
+        default=COMPRESSION_ZLIB,
+        help='Сжатие ответов в HTTP-кеше'
+    )
+    parser.add_argument(
+        '--cache-compression-level',
+        type=positive_int,
+        metavar='LEVEL',
+        help='Уровень сжатия ответов в HTTP-кеше'
+    )
     parser.add_argument(
         '-o',
         '--output',
         choices=(OUTPUT_PRETTY, OUTPUT_FILE),
         help='Дополнительные способы вывода данных'
     )
+    parser.add_argument(
+        '-f',
+        '--file-format',
+        choices=tuple(FILE_FORMAT_TO_WRITER),
+        default=FILE_FORMAT_CSV,
+        help='Формат файла для --output file'
+    )
+    parser.add_argument(
+        '-w',
+        '--workers',
+        type=positive_int,
+        default=DEFAULT_WORKERS,
+        help='Количество параллельных загрузок страниц'
+    )
+    parser.add_argument(
+        '--parse-workers',
+        type=positive_int,
+        default=DEFAULT_PARSE_WORKERS,
+        help='Количество процессов для разбора страниц'
+    )
+    parser.add_argument(
+        '-e',
+        '--engine',
+        choices=(ENGINE_THREADS, ENGINE_ASYNC),
+        default=ENGINE_THREADS,
+        help='Движок загрузки страниц (async не перепроверяет кеш)'
+    )
+    parser.add_argument(
+        '--parser',
+        choices=PARSERS,
+        default=DEFAULT_PARSER,
+        help='Библиотека разбора HTML'
+    )
+    parser.add_argument(
+        '--pool-size',
+        type=positive_int,
+        default=DEFAULT_POOL_SIZE,
+        help='Размер пула HTTP-соединений на хост'
+    )
+    parser.add_argument(
+        '--retries',
+        type=non_negative_int,
+        default=DEFAULT_RETRIES,
+        help='Число повторов запроса при сбоях и ответах 429/5xx'
+    )
+    parser.add_argument(
+        '--timeout',
+        type=positive_float,
+        default=DEFAULT_TIMEOUT,
+        help='Таймаут HTTP-запроса в секундах'
+    )
+    parser.add_argument(
+        '--rate-limit',
+        type=rate_limit,
+        action='append',
+        metavar='[HOST=]RATE[:BURST]',
+        help='Ограничение частоты запросов к хосту (запросов в секунду)'
+    )
+    parser.add_argument(
+        '-i',
+        '--incremental',
+        action='store_true',
+        help='Загружать только новые и изменившиеся PEP'
+    )
+    parser.add_argument(
+        '--resume',
+        action='store_true',
+        help='Продолжить прерванный обход с контрольной точки'
+    )
+    parser.add_argument(
+        '--stream-parse',
+        action='store_true',
+        help='Обрывать загрузку страницы, когда нужные данные найдены'
+    )
+    parser.add_argument(
+        '--per-pep',
+        action='store_true',
+        help='Выводить в режиме pep строку на каждый PEP вместо сводки'
+    )
+    parser.add_argument(
+        '--archive',
+        type=Path,
+        default=SNAPSHOT_PATH,
+        metavar='PATH',
+        help='Файл архива, который записывает режим snapshot'
+    )
+    parser.add_argument(
+        '--replay',
+        type=Path,
+        metavar='ARCHIVE',
+        help='Отдавать ответы из архива snapshot без обращения к сети'
+    )
+    parser.add_argument(
+        '--profile',
+        action='store_true',
+        help='Вывести время работы этапов парсинга'
+    )
+    parser.add_argument(
+        '--profile-json',
+        metavar='PATH',
+        help='Сохранить время работы этапов парсинга в JSON-файл'
+    )
     return parser
 
 
@@ -12,6 +12,12 @@ DATETIME_FORMAT = '%Y-%m-%d_%H-%M-%S'
 BASE_LOG_DIR = BASE_DIR / 'logs'
 RESULTS_DIR = BASE_DIR / 'results'
 LOG_FILE_PATH = BASE_LOG_DIR / 'parser.log'
+STATE_DIR = BASE_DIR / 'state'
+PEP_STATE_PATH = STATE_DIR / 'pep.sqlite3'
+MEMO_PATH = STATE_DIR / 'memo.sqlite3'
+CHECKPOINTS_DIR = BASE_DIR / 'checkpoints'
+SNAPSHOTS_DIR = BASE_DIR / 'snapshots'
+SNAPSHOT_PATH = SNAPSHOTS_DIR / 'snapshot.sqlite3'
 
 RESULTS = 'results'
 DOWNLOADS = 'downloads'
@@ -22,9 +28,23 @@ LOG_FORMAT = '"%(asctime)s - [%(levelname)s] - %(message)s"'
 LOG_MAX_BYTES = 10**6
 LOG_BACKUP_COUNT = 5
 
+MODE_ALL = 'all'
+MODE_SNAPSHOT = 'snapshot'
+
 OUTPUT_PRETTY = 'pretty'
 OUTPUT_FILE = 'file'
 
+PARSER_BS4 = 'bs4'
+PARSER_LXML = 'lxml'
+PARSER_SELECTOLAX = 'selectolax'
+PARSERS = (PARSER_BS4, PARSER_LXML, PARSER_SELECTOLAX)
+DEFAULT_PARSER = PARSER_BS4
+
+FILE_FORMAT_CSV = 'csv'
+FILE_FORMAT_JSONL = 'jsonl'
+FILE_FORMAT_PARQUET = 'parquet'
+FILE_FORMAT_ARROW = 'arrow'
+
 EXPECTED_STATUS = {
     'A': ('Active', 'Accepted'),
     'D': ('Deferred',),
@@ -35,3 +55,65 @@ EXPECTED_STATUS = {
     'W': ('Withdrawn',),
     '': ('Draft', 'Active'),
 }
+
+DEFAULT_WORKERS = 1
+DEFAULT_PARSE_WORKERS = 1
+PARSE_QUEUE_PER_WORKER = 4
+DEFAULT_POOL_SIZE = 10
+DEFAULT_RETRIES = 3
+DEFAULT_TIMEOUT = 30
+RETRY_BACKOFF_FACTOR = 0.5
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+RATE_LIMITED_STATUSES = {429, 503}
+RATE_DECREASE_FACTOR = 0.5
+RATE_INCREASE_FRACTION = 0.05
+RATE_MIN = 0.1
+
+ENGINE_THREADS = 'threads'
+ENGINE_ASYNC = 'async'
+ASYNC_CONNECTIONS_PER_HOST = 10
+
+DOWNLOAD_CHUNK_SIZE = 64 * 1024
+STREAM_CHUNK_SIZE = 8 * 1024
+ENCODING_SNIFF_SIZE = 1024
+# Заголовки сжатия и длины тела, которые не относятся к уже
+# распакованному и прочитанному целиком телу ответа.
+BODY_ENCODING_HEADERS = (
+    'content-encoding', 'content-length', 'transfer-encoding',
+)
+# Запрос с этим заголовком HTTP-кеш сессии не читает и не записывает;
+# в отличие от cache_disabled() это действует только на один запрос.
+NO_STORE_HEADERS = {'Cache-Control': 'no-store'}
+
+CACHE_NAME = 'http_cache'
+CACHE_SQLITE = 'sqlite'
+CACHE_FILESYSTEM = 'filesystem'
+CACHE_MEMORY = 'memory'
+CACHE_REDIS = 'redis'
+CACHE_BACKENDS = (CACHE_SQLITE, CACHE_FILESYSTEM, CACHE_MEMORY, CACHE_REDIS)
+SQLITE_BUSY_TIMEOUT = 30 * 1000
+
+COMPRESSION_NONE = 'none'
+COMPRESSION_ZLIB = 'zlib'
+COMPRESSION_ZSTD = 'zstd'
+# Наименьший, стандартный и наибольший уровни сжатия.
+COMPRESSION_LEVELS = {
+    COMPRESSION_ZLIB: (1, 6, 9),
+    COMPRESSION_ZSTD: (1, 3, 22),
+}
+REDIS_URL = 'redis://localhost:6379/0'
+
+CACHE_HIT = 'hit'
+CACHE_MISS = 'miss'
+CACHE_REVALIDATED = 'revalidated'
+
+# Версия ключей кеша разбора: увеличивается при каждом изменении
+# результатов функций извлечения (extract_*), чтобы старые записи
+# не отдавались вместо новых.
+MEMO_VERSION = 2
+MEMO_MAX_ENTRIES = 5000
+MEMO_COMMIT_INTERVAL = 50
+RESPONSE_MEMO_SIZE = 256
+
+SNAPSHOT_COMPRESSION_LEVEL = 9
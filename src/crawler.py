@@ -0,0 +1,382 @@
+import logging
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from importlib.util import find_spec
+
+from constants import (
+    ASYNC_CONNECTIONS_PER_HOST,
+    BODY_ENCODING_HEADERS,
+    CACHE_HIT,
+    CACHE_MISS,
+    DEFAULT_PARSE_WORKERS,
+    DEFAULT_TIMEOUT,
+    DEFAULT_WORKERS,
+    ENGINE_ASYNC,
+    ENGINE_THREADS,
+    PARSE_QUEUE_PER_WORKER,
+)
+from exceptions import RequestError
+from memo import MISSING
+from parsers import declared_encoding, get_parser, page_markup, set_parser
+from profiling import profiler
+
+
+def crawl(
+    session,
+    urls,
+    fetch,
+    extract,
+    workers=DEFAULT_WORKERS,
+    errors=(),
+    engine=ENGINE_THREADS,
+    parse_workers=DEFAULT_PARSE_WORKERS,
+):
+    """Отдаёт (url, extract(html), error) по ссылкам в исходном порядке.
+
+    Страницы загружает fetch(session, url); исключения из errors
+    возвращаются в error. Если extract равна None, fetch сама возвращает
+    извлечённые данные.
+    """
+    # Ответы из архива снимка отдаёт адаптер requests, а не aiohttp.
+    if getattr(session, 'replay', None) is not None:
+        engine = ENGINE_THREADS
+    # Потоковый разбор: данные извлекает fetch, кеш разбора не ведётся.
+    if extract is None:
+        if engine == ENGINE_ASYNC:
+            raise RuntimeError(
+                'Потоковый разбор работает только с движком threads'
+            )
+        yield from _crawl(
+            session, urls, fetch, lambda url, result: result,
+            workers, errors, engine
+        )
+        return
+
+    memo = getattr(session, 'memo', None)
+    if parse_workers > 1:
+        pages = _crawl(
+            session, urls, fetch, lambda url, html: html,
+            workers, errors, engine
+        )
+        yield from _parse_in_processes(
+            pages, extract, memo, parse_workers, errors
+        )
+        return
+
+    # Неизменившиеся страницы берутся из кеша разбора (session.memo).
+    def parse(url, html):
+        with profiler.stage('extract'):
+            if memo is None:
+                return extract(html)
+            return memo.extract(url, html, extract)
+
+    yield from _crawl(session, urls, fetch, parse, workers, errors, engine)
+
+
+def _crawl(session, urls, fetch, parse, workers, errors, engine):
+    """Загружает страницы выбранным движком и отдаёт parse(url, html)."""
+    if engine == ENGINE_ASYNC:
+        yield from _crawl_async(session, urls, parse, workers, errors)
+        return
+
+    def task(url):
+        try:
+            return url, parse(url, fetch(session, url)), None
+        except errors as error:
+            return url, None, error
+
+    if workers <= 1:
+        yield from map(task, urls)
+        return
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        yield from executor.map(task, urls)
+
+
+def _parse_in_processes(pages, extract, memo, parse_workers, errors):
+    """Разбирает загруженные страницы в пуле процессов по порядку.
+
+    В процессы передаётся только HTML-код, обратно — результат extract.
+    extract передаётся в процессы по имени, поэтому должна быть функцией
+    уровня модуля.
+    Очередь разбора ограничена, чтобы загрузка не уходила далеко вперёд.
+    Кеш результатов извлечения проверяется и пополняется в основном
+    процессе. Процессы запускаются через spawn: fork процесса с уже
+    работающими потоками загрузки небезопасен, поэтому выбранная
+    библиотека разбора HTML передаётся им при запуске.
+    """
+    import multiprocessing
+    from concurrent.futures import ProcessPoolExecutor
+
+    pending = deque()
+    with ProcessPoolExecutor(
+        max_workers=parse_workers,
+        mp_context=multiprocessing.get_context('spawn'),
+        initializer=set_parser,
+        initargs=(get_parser(),),
+    ) as executor:
+        for url, html, error in pages:
+            key = future = None
+            if error is None:
+                key, future = _submit_parse(executor, extract, memo, url, html)
+            pending.append((url, key, future, error))
+            if len(pending) >= parse_workers * PARSE_QUEUE_PER_WORKER:
+                yield _collect_parse(pending.popleft(), memo, errors)
+        while pending:
+            yield _collect_parse(pending.popleft(), memo, errors)
+
+
+def _submit_parse(executor, extract, memo, url, html):
+    """Возвращает ключ кеша и Future с результатом извлечения."""
+    if memo is None:
+        return None, executor.submit(extract, html)
+    key = memo.make_key(extract, url, html)
+    value = memo.get(key, MISSING)
+    if value is MISSING:
+        return key, executor.submit(extract, html)
+    future = Future()
+    future.set_result(value)
+    return None, future
+
+
+def _collect_parse(item, memo, errors):
+    """Дожидается разбора страницы и сохраняет результат в кеш."""
+    url, key, future, error = item
+    if error is not None:
+        return url, None, error
+    try:
+        with profiler.stage('extract'):
+            result = future.result()
+    except errors as parse_error:
+        return url, None, parse_error
+    if key is not None:
+        memo.put(key, result)
+    return url, result, None
+
+
+def get_cached_content(session, url):
+    """Возвращает тело страницы из HTTP-кеша сессии, если оно свежее.
+
+    Тело подготавливается для функций извлечения, как в get_content.
+    """
+    cache = getattr(session, 'cache', None)
+    if cache is None:
+        return None
+    from requests import Request
+
+    request = session.prepare_request(Request('GET', url))
+    response = cache.get_response(cache.create_key(request))
+    if response is None or response.is_expired:
+        return None
+    return page_markup(
+        response.content, declared_encoding(response.headers)
+    )
+
+
+def save_cached_content(session, url, status, headers, body):
+    """Сохраняет ответ, загруженный в обход requests, в HTTP-кеш сессии.
+
+    Срок хранения и запрет записи определяются настройками кеша сессии
+    и заголовками ответа так же, как для ответов requests-cache. Тело
+    передаётся уже распакованным, поэтому заголовки его сжатия и длины
+    не сохраняются.
+    """
+    cache = getattr(session, 'cache', None)
+    if cache is None:
+        return
+    from io import BytesIO
+
+    from requests import Request, Response
+    from requests.structures import CaseInsensitiveDict
+    from requests_cache.policy import CacheActions
+    from urllib3 import HTTPResponse
+
+    headers = {
+        name: value for name, value in headers.items()
+        if name.lower() not in BODY_ENCODING_HEADERS
+    }
+    request = session.prepare_request(Request('GET', url))
+    response = Response()
+    response.status_code = status
+    response.headers = CaseInsensitiveDict(headers)
+    response.url = url
+    response.request = request
+    response.raw = HTTPResponse(
+        body=BytesIO(body), headers=headers, status=status,
+        preload_content=False, request_url=url,
+    )
+    actions = CacheActions.from_request(
+        cache.create_key(request), request, session.settings
+    )
+    actions.update_from_response(response)
+    if not actions.skip_write:
+        cache.save_response(response, actions.cache_key, actions.expires)
+
+
+def count_cache_status(session, status):
+    """Учитывает обращение к кешу в статистике сессии, если она ведётся."""
+    count = getattr(session, 'count_cache_status', None)
+    if count is not None:
+        count(status)
+
+
+def get_retry(session, url):
+    """Возвращает политику повторов (urllib3 Retry) адаптера сессии."""
+    get_adapter = getattr(session, 'get_adapter', None)
+    if get_adapter is None:
+        return None
+    return getattr(get_adapter(url), 'max_retries', None)
+
+
+def get_retry_delay(retry, attempt, retry_after=None):
+    """Возвращает паузу в секундах перед повтором запроса.
+
+    Пауза растёт экспоненциально с номером попытки attempt, а заголовок
+    Retry-After, если политика retry его учитывает, задаёт её явно.
+    Предел паузы в urllib3 < 2 хранится в атрибуте класса BACKOFF_MAX.
+    """
+    if retry_after and retry.respect_retry_after_header:
+        from urllib3.exceptions import InvalidHeader
+
+        try:
+            return retry.parse_retry_after(retry_after)
+        except InvalidHeader:
+            pass
+    backoff_max = getattr(retry, 'backoff_max', None) or retry.BACKOFF_MAX
+    return min(backoff_max, retry.backoff_factor * 2 ** attempt)
+
+
+async def _request_async(client, semaphore, rate_limiter, url):
+    """Выполняет один запрос через aiohttp и возвращает код, заголовки и тело.
+
+    Если задан rate_limiter, перед запросом выдерживается пауза, а статус
+    ответа сообщается ограничителю для подстройки частоты.
+    """
+    import asyncio
+
+    async with semaphore:
+        if rate_limiter is not None:
+            await asyncio.sleep(rate_limiter.reserve(url))
+        with profiler.stage('fetch'):
+            async with client.get(url) as response:
+                if rate_limiter is not None:
+                    rate_limiter.report(url, [response.status])
+                return (
+                    response.status,
+                    dict(response.headers),
+                    await response.read(),
+                )
+
+
+async def _fetch_async(session, client, semaphore, url):
+    """Загружает страницу через aiohttp, повторяя запрос при сбоях.
+
+    Число и задержка повторов берутся из политики повторов адаптера
+    сессии, как в потоковом движке: ошибки соединения и ответы 429/5xx
+    повторяются с экспоненциальной задержкой и с учётом Retry-After.
+    Успешный ответ сохраняется в HTTP-кеш сессии.
+    """
+    import asyncio
+
+    import aiohttp
+
+    rate_limiter = getattr(session, 'rate_limiter', None)
+    retry = get_retry(session, url)
+    retries = (retry.total or 0) if retry is not None else 0
+    for attempt in range(retries + 1):
+        try:
+            status, headers, body = await _request_async(
+                client, semaphore, rate_limiter, url
+            )
+        except (aiohttp.ClientError, asyncio.TimeoutError) as error:
+            if attempt == retries:
+                raise RequestError(
+                    f'Ошибка при загрузке страницы {url}: {error!r}'
+                )
+            await asyncio.sleep(get_retry_delay(retry, attempt))
+            continue
+        if attempt == retries or status not in (
+            retry.status_forcelist or ()
+        ):
+            break
+        await asyncio.sleep(
+            get_retry_delay(retry, attempt, headers.get('Retry-After'))
+        )
+    if status >= 400:
+        raise RequestError(
+            f'Ошибка при загрузке страницы {url}: HTTP {status}'
+        )
+    profiler.count('bytes', len(body))
+    count_cache_status(session, CACHE_MISS)
+    save_cached_content(session, url, status, headers, body)
+    return page_markup(body, declared_encoding(headers))
+
+
+async def _open_client(workers, timeout):
+    """Создаёт клиент aiohttp и общий семафор внутри цикла событий."""
+    import asyncio
+
+    import aiohttp
+
+    connector = aiohttp.TCPConnector(
+        limit=0, limit_per_host=ASYNC_CONNECTIONS_PER_HOST
+    )
+    client = aiohttp.ClientSession(
+        connector=connector, timeout=aiohttp.ClientTimeout(total=timeout)
+    )
+    return client, asyncio.Semaphore(workers)
+
+
+def _crawl_async(session, urls, parse, workers, errors):
+    """Загружает страницы в одном цикле событий и отдаёт их по порядку.
+
+    Страницы загружаются через aiohttp, а не fetch. Все загрузки
+    ставятся в цикл сразу, а одновременно выполняется не более workers
+    запросов; таймаут берётся из сессии. Страницы берутся
+    из HTTP-кеша сессии и сохраняются в него, повторяющиеся ссылки
+    загружаются один раз. Условных запросов (--revalidate) движок не
+    отправляет. Цикл прокручивается до завершения очередной загрузки,
+    поэтому результаты отдаются по мере готовности.
+    """
+    if find_spec('aiohttp') is None:
+        raise RuntimeError(
+            'Для асинхронного движка установите пакет aiohttp'
+        )
+    import asyncio
+
+    settings = getattr(session, 'settings', None)
+    if getattr(settings, 'always_revalidate', False):
+        logging.warning(
+            'Асинхронный движок не перепроверяет HTTP-кеш: ответы из кеша '
+            'используются без условных запросов'
+        )
+    loop = asyncio.new_event_loop()
+    client, semaphore = loop.run_until_complete(_open_client(
+        workers, getattr(session, 'timeout', DEFAULT_TIMEOUT)
+    ))
+    tasks = {}
+    for url in urls:
+        if url in tasks:
+            continue
+        text = get_cached_content(session, url)
+        if text is None:
+            coroutine = _fetch_async(session, client, semaphore, url)
+        else:
+            count_cache_status(session, CACHE_HIT)
+            coroutine = asyncio.sleep(0, result=text)
+        tasks[url] = loop.create_task(coroutine)
+    try:
+        for url in urls:
+            try:
+                html = loop.run_until_complete(tasks[url])
+                yield url, parse(url, html), None
+            except errors as error:
+                yield url, None, error
+    finally:
+        for task in tasks.values():
+            task.cancel()
+        loop.run_until_complete(
+            asyncio.gather(*tasks.values(), return_exceptions=True)
+        )
+        loop.run_until_complete(client.close())
+        loop.close()
@@ -1,26 +1,58 @@
 import logging
 import re
-import requests
+from argparse import Namespace
+from concurrent.futures import ThreadPoolExecutor
 from urllib.parse import urljoin
 
-from requests_cache import CachedSession
-from tqdm import tqdm
-
+from checkpoints import Checkpoint
 from configs import configure_argument_parser, configure_logging
-from constants import BASE_DIR, DOWNLOADS, MAIN_DOC_URL
+from constants import (
+    BASE_DIR,
+    CHECKPOINTS_DIR,
+    DEFAULT_PARSE_WORKERS,
+    DEFAULT_WORKERS,
+    DOWNLOADS,
+    ENGINE_THREADS,
+    MAIN_DOC_URL,
+    MODE_ALL,
+    MODE_SNAPSHOT,
+    OUTPUT_FILE,
+)
+from crawler import crawl
 from outputs import control_output
+from parsers import set_parser
+from profiling import profiler
+from state import PepState
 from exceptions import ParsingError, RequestError
 from utils import (
+    download_file,
+    extract_whats_new,
     find_tag,
+    get_content,
     parse_pep_list,
     process_pep_data,
     save_to_csv,
     get_soup,
+    stream_whats_new,
+    streaming,
 )
 
 
-def whats_new(session):
-    """Парсит страницу с нововведениями в Python."""
+@streaming
+def whats_new(
+    session,
+    workers=DEFAULT_WORKERS,
+    engine=ENGINE_THREADS,
+    resume=False,
+    parse_workers=DEFAULT_PARSE_WORKERS,
+    stream_parse=False,
+):
+    """Парсит страницу с нововведениями в Python.
+
+    Обработанные статьи записываются в контрольную точку; с resume=True
+    статьи из неё не загружаются повторно. С stream_parse=True загрузка
+    статьи обрывается, как только найдены её заголовок и авторы.
+    """
     whats_new_url = urljoin(MAIN_DOC_URL, 'whatsnew/')
     try:
         soup = get_soup(session, whats_new_url)
@@ -30,7 +62,7 @@ def whats_new(session):
             whats_new_url,
             error
         )
-        return []
+        return
 
     main_div = find_tag(
         soup, 'section', attrs={'id': 'what-s-new-in-python'}
@@ -41,22 +73,21 @@ def whats_new(session):
     sections_by_python = div_with_ul.find_all(
         'li', attrs={'class': 'toctree-l1'}
     )
-
-    results = [('Ссылка на статью', 'Заголовок', 'Редактор, автор')]
-    skipped_links = []
-
-    for section in tqdm(sections_by_python):
-        version_a_tag = section.find('a')
-        href = version_a_tag['href']
-        version_link = urljoin(whats_new_url, href)
-        try:
-            soup = get_soup(session, version_link)
-            h1 = find_tag(soup, 'h1')
-            dl = find_tag(soup, 'dl')
-            dl_text = dl.text.replace('\n', ' ')
-            results.append((version_link, h1.text, dl_text))
-        except RequestError:
-            skipped_links.append(version_link)
+    version_links = [
+        urljoin(whats_new_url, section.find('a')['href'])
+        for section in sections_by_python
+    ]
+
+    yield ('Ссылка на статью', 'Заголовок', 'Редактор, автор')
+    checkpoint_path = CHECKPOINTS_DIR / 'whats-new.jsonl'
+    with Checkpoint(checkpoint_path, resume) as checkpoint:
+        skipped_links = yield from whats_new_articles(
+            session, version_links, checkpoint,
+            workers=workers, engine=engine, parse_workers=parse_workers,
+            stream_parse=stream_parse
+        )
+        if not skipped_links:
+            checkpoint.remove()
 
     if skipped_links:
         logging.warning(
@@ -64,16 +95,50 @@ def whats_new(session):
             ', '.join(skipped_links)
         )
 
-    return results
-
 
+def whats_new_articles(
+    session, version_links, checkpoint, stream_parse=False, **crawl_options
+):
+    """Отдаёт строки статей «Что нового» в порядке ссылок.
+
+    Статьи из контрольной точки берутся из неё, остальные загружаются
+    через crawl с параметрами crawl_options и записываются в неё.
+    Возвращает список ссылок, которые не удалось загрузить.
+    """
+    from tqdm import tqdm
+
+    fetch, extract = get_content, extract_whats_new
+    if stream_parse:
+        fetch, extract = stream_whats_new, None
+    pages = crawl(
+        session,
+        [link for link in version_links if link not in checkpoint.done],
+        fetch, extract,
+        errors=(RequestError,), **crawl_options
+    )
+    skipped_links = []
+    for version_link in tqdm(
+        profiler.timed('whats_new.item', version_links),
+        total=len(version_links)
+    ):
+        if version_link not in checkpoint.done:
+            _, article, error = next(pages)
+            if error is not None:
+                skipped_links.append(version_link)
+                continue
+            checkpoint.add(version_link, article)
+        yield (version_link, *checkpoint.done[version_link])
+    return skipped_links
+
+
+@streaming
 def latest_versions(session):
     """Парсит список последних версий Python."""
     try:
         soup = get_soup(session, MAIN_DOC_URL)
-    except requests.RequestException as error:
+    except RequestError as error:
         logging.error("Ошибка при загрузке главной страницы: %s", error)
-        return []
+        return
 
     sidebar = find_tag(soup, 'div', attrs={'class': 'sphinxsidebarwrapper'})
     ul_tags = sidebar.find_all('ul')
@@ -87,7 +152,7 @@ def latest_versions(session):
             'Не найден раздел "All versions" в боковом меню.'
         )
 
-    results = [('Ссылка на документацию', 'Версия', 'Статус')]
+    yield ('Ссылка на документацию', 'Версия', 'Статус')
     pattern = r'Python (?P<version>\d\.\d+) \((?P<status>.*)\)'
 
     for a_tag in a_tags:
@@ -97,13 +162,13 @@ def latest_versions(session):
             a_tag.text, ''
         )
 
-        results.append((link, version, status))
-
-    return results
+        yield (link, version, status)
 
 
 def download(session):
     """Скачивает PDF-документацию по Python."""
+    from requests import RequestException
+
     downloads_url = urljoin(MAIN_DOC_URL, 'download.html')
     try:
         soup = get_soup(session, downloads_url)
@@ -119,32 +184,54 @@ def download(session):
     pdf_a4_link = pdf_a4_tag['href']
     archive_url = urljoin(downloads_url, pdf_a4_link)
 
-    try:
-        response = session.get(archive_url)
-        response.raise_for_status()
-    except requests.RequestException as error:
-        logging.error("Ошибка при скачивании архива: %s", error)
-        return
-
     filename = archive_url.split('/')[-1]
     downloads_dir = BASE_DIR / DOWNLOADS
     downloads_dir.mkdir(exist_ok=True)
     archive_path = downloads_dir / filename
 
-    with open(archive_path, 'wb') as file:
-        file.write(response.content)
+    try:
+        download_file(session, archive_url, archive_path)
+    except RequestException as error:
+        logging.error("Ошибка при скачивании архива: %s", error)
+        return
 
     logging.info("Архив был загружен и сохранён: %s", archive_path)
 
 
-def pep(session):
-    """Парсит PEP-документы, считает их статусы и сохраняет в CSV."""
+def pep(
+    session,
+    workers=DEFAULT_WORKERS,
+    engine=ENGINE_THREADS,
+    incremental=False,
+    resume=False,
+    parse_workers=DEFAULT_PARSE_WORKERS,
+    per_pep=False,
+    stream_parse=False,
+):
+    """Парсит PEP-документы, считает их статусы и сохраняет в CSV.
+
+    С per_pep=True возвращает вместо сводки строку на каждый PEP.
+    """
     pep_links = parse_pep_list(session)
-
-    status_counts = process_pep_data(session, pep_links)
+    pep_rows = [] if per_pep else None
+
+    with Checkpoint(CHECKPOINTS_DIR / 'pep.jsonl', resume) as checkpoint:
+        status_counts = process_pep_data(
+            session, pep_links, workers=workers, engine=engine,
+            state=PepState() if incremental else None,
+            checkpoint=checkpoint, parse_workers=parse_workers,
+            pep_rows=pep_rows, stream_parse=stream_parse
+        )
 
     save_to_csv(status_counts, 'pep_summary.csv')
 
+    if per_pep:
+        header = (
+            'Номер', 'Ссылка', 'Ожидаемые статусы', 'Статус в карточке',
+            'Несовпадение',
+        )
+        return [header] + pep_rows
+
     return [("Статус", "Количество")] + list(status_counts.items())
 
 
@@ -155,26 +242,170 @@ MODE_TO_FUNCTION = {
     'pep': pep,
 }
 
+MODE_OPTIONS = {
+    'whats-new': (
+        'workers', 'engine', 'resume', 'parse_workers', 'stream_parse',
+    ),
+    'pep': (
+        'workers', 'engine', 'incremental', 'resume', 'parse_workers',
+        'per_pep', 'stream_parse',
+    ),
+}
+
+
+def run_mode(session, parser_mode, cli_args):
+    """Запускает режим парсера с относящимися к нему аргументами CLI.
+
+    Потоковые режимы возвращают генератор строк, а не готовый список.
+    """
+    options = {
+        option: getattr(cli_args, option)
+        for option in MODE_OPTIONS.get(parser_mode, ())
+    }
+    mode_function = MODE_TO_FUNCTION[parser_mode]
+    return getattr(mode_function, 'rows', mode_function)(session, **options)
+
+
+def resolve_modes(modes):
+    """Раскрывает all в список всех режимов и убирает повторы."""
+    resolved = []
+    for mode in modes:
+        for name in MODE_TO_FUNCTION if mode == MODE_ALL else (mode,):
+            if name not in resolved:
+                resolved.append(name)
+    return resolved
+
+
+def output_mode(session, parser_mode, cli_args):
+    """Запускает режим парсера и выводит его результаты."""
+    results = run_mode(session, parser_mode, cli_args)
+    if results is not None:
+        control_output(results, cli_args)
+
+
+def collect_mode(session, parser_mode, cli_args):
+    """Выполняет режим в потоке пакетного запуска.
+
+    Файл результатов записывается по мере получения строк, а строки для
+    вывода в консоль возвращаются списком.
+    """
+    if cli_args.output == OUTPUT_FILE:
+        output_mode(session, parser_mode, cli_args)
+        return None
+    results = run_mode(session, parser_mode, cli_args)
+    return None if results is None else list(results)
+
+
+def run_modes(session, modes, cli_args):
+    """Запускает режимы парсера на одной сессии.
+
+    Каждый режим получает свою копию аргументов CLI, поэтому пишет свой
+    файл результатов. Несколько режимов выполняются одновременно в
+    отдельных потоках; вывод в консоль печатается по порядку режимов,
+    чтобы строки разных режимов не перемешивались. Ошибка одного режима
+    не прерывает остальные.
+    """
+    mode_args = {
+        mode: Namespace(**{**vars(cli_args), 'mode': mode}) for mode in modes
+    }
+    if len(modes) == 1:
+        output_mode(session, modes[0], mode_args[modes[0]])
+        return
+
+    with ThreadPoolExecutor(max_workers=len(modes)) as executor:
+        futures = {
+            mode: executor.submit(
+                collect_mode, session, mode, mode_args[mode]
+            )
+            for mode in modes
+        }
+        for mode, future in futures.items():
+            try:
+                results = future.result()
+            except Exception as error:
+                logging.exception(
+                    "Ошибка в режиме %s: %s", mode, error
+                )
+                continue
+            if results is not None:
+                control_output(results, mode_args[mode])
+            logging.info("Режим %s завершён", mode)
+
+
+def snapshot(session, modes, cli_args):
+    """Записывает ответы на все запросы режимов в архив снимка.
+
+    Режимы выполняются по очереди без вывода результатов, а каждый ответ
+    сессии, в том числе взятый из HTTP-кеша, записывается в архив
+    --archive. Чтобы в архив попали все страницы, загрузка идёт потоковым
+    движком, страницы загружаются целиком (без --stream-parse), а PEP
+    и статьи из прошлых запусков не пропускаются.
+    """
+    from snapshots import SnapshotArchive
+
+    mode_args = Namespace(**{
+        **vars(cli_args),
+        'engine': ENGINE_THREADS,
+        'incremental': False,
+        'resume': False,
+        'stream_parse': False,
+    })
+    with SnapshotArchive(cli_args.archive) as archive:
+        session.hooks['response'].append(archive.record)
+        try:
+            for mode in modes:
+                try:
+                    for _ in run_mode(session, mode, mode_args) or ():
+                        pass
+                except Exception as error:
+                    logging.exception(
+                        "Ошибка в режиме %s: %s", mode, error
+                    )
+        finally:
+            session.hooks['response'].remove(archive.record)
+        logging.info(
+            "Снимок сохранён: %s, ответов: %s", cli_args.archive, len(archive)
+        )
+
 
 def main():
-    """Точка входа в программу."""
+    """Точка входа в программу.
+
+    Тяжёлые зависимости (requests, requests-cache, bs4, lxml, selectolax,
+    tqdm, prettytable, aiohttp) импортируются только режимами и способами
+    вывода, которым они нужны, поэтому --help и разбор аргументов работают
+    без них.
+    """
     configure_logging()
     logging.info("Парсер запущен!")
 
     try:
-        args_parser = configure_argument_parser(MODE_TO_FUNCTION.keys())
+        args_parser = configure_argument_parser(
+            (*MODE_TO_FUNCTION, MODE_ALL, MODE_SNAPSHOT)
+        )
         args = args_parser.parse_args()
         logging.info("Аргументы командной строки: %s", args)
+        if args.profile or args.profile_json:
+            profiler.enable()
+        set_parser(args.parser)
 
-        session = CachedSession()
-        if args.clear_cache:
-            session.cache.clear()
+        from sessions import create_session
 
-        parser_mode = args.mode
-        results = MODE_TO_FUNCTION[parser_mode](session)
-
-        if results is not None:
-            control_output(results, args)
+        session = create_session(args)
+        try:
+            modes = [mode for mode in args.mode if mode != MODE_SNAPSHOT]
+            if len(modes) < len(args.mode):
+                snapshot(session, resolve_modes(modes or [MODE_ALL]), args)
+            else:
+                run_modes(session, resolve_modes(modes), args)
+            session.log_cache_stats()
+        finally:
+            session.close()
+
+        if args.profile:
+            profiler.print_summary()
+        if args.profile_json:
+            profiler.dump_json(args.profile_json)
 
     except Exception as e:
         logging.exception(
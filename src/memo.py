@@ -0,0 +1,119 @@
+import hashlib
+import json
+import sqlite3
+import time
+from threading import Lock
+
+from constants import (
+    MEMO_COMMIT_INTERVAL,
+    MEMO_MAX_ENTRIES,
+    MEMO_PATH,
+    MEMO_VERSION,
+)
+from parsers import get_parser
+
+MISSING = object()
+
+
+class ExtractionMemo:
+    """Дисковый кеш результатов извлечения данных из страниц.
+
+    Ключ — версия кеша (MEMO_VERSION), библиотека разбора (--parser), имя
+    функции извлечения, ссылка и хеш HTML-кода страницы, поэтому для
+    неизменившейся страницы результат берётся из кеша без разбора HTML.
+    Записи прежних версий удаляются при открытии.
+    Изменения сохраняются на диск каждые commit_interval записей, так что
+    при аварийном завершении теряются только последние из них. При закрытии
+    вытесняются давно не использованные записи сверх max_entries.
+    Результаты-списки возвращаются кортежами, как их отдают функции
+    извлечения.
+    """
+
+    def __init__(
+        self,
+        path=MEMO_PATH,
+        max_entries=MEMO_MAX_ENTRIES,
+        commit_interval=MEMO_COMMIT_INTERVAL,
+    ):
+        self.max_entries = max_entries
+        self.commit_interval = commit_interval
+        self.hits = 0
+        self.misses = 0
+        self._pending = 0
+        self._lock = Lock()
+        path.parent.mkdir(exist_ok=True)
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        self._connection.execute(
+            'CREATE TABLE IF NOT EXISTS memo '
+            '(key TEXT PRIMARY KEY, value TEXT, used_at REAL)'
+        )
+        with self._connection:
+            self._connection.execute(
+                'DELETE FROM memo WHERE key NOT LIKE ?', (f'{MEMO_VERSION}:%',)
+            )
+
+    @staticmethod
+    def make_key(extract, url, html):
+        if isinstance(html, str):
+            html = html.encode('utf-8')
+        digest = hashlib.sha256(html).hexdigest()
+        return (
+            f'{MEMO_VERSION}:{get_parser()}:{extract.__qualname__}:'
+            f'{url}:{digest}'
+        )
+
+    def get(self, key, default=None):
+        """Возвращает сохранённый результат по ключу или default."""
+        with self._lock:
+            row = self._connection.execute(
+                'SELECT value FROM memo WHERE key = ?', (key,)
+            ).fetchone()
+            if row is None:
+                return default
+            self.hits += 1
+            self._connection.execute(
+                'UPDATE memo SET used_at = ? WHERE key = ?',
+                (time.time(), key)
+            )
+            self._count_write()
+        value = json.loads(row[0])
+        return tuple(value) if isinstance(value, list) else value
+
+    def put(self, key, value):
+        """Сохраняет результат извлечения по ключу."""
+        with self._lock:
+            self.misses += 1
+            self._connection.execute(
+                'INSERT OR REPLACE INTO memo VALUES (?, ?, ?)',
+                (key, json.dumps(value), time.time())
+            )
+            self._count_write()
+
+    def _count_write(self):
+        self._pending += 1
+        if self._pending >= self.commit_interval:
+            self._connection.commit()
+            self._pending = 0
+
+    def extract(self, url, html, extract):
+        """Возвращает extract(html), по возможности из кеша."""
+        key = self.make_key(extract, url, html)
+        value = self.get(key, MISSING)
+        if value is MISSING:
+            value = extract(html)
+            self.put(key, value)
+        return value
+
+    def clear(self):
+        with self._lock, self._connection:
+            self._connection.execute('DELETE FROM memo')
+
+    def close(self):
+        """Вытесняет лишние записи и сохраняет кеш на диск."""
+        with self._lock, self._connection:
+            self._connection.execute(
+                'DELETE FROM memo WHERE key NOT IN '
+                '(SELECT key FROM memo ORDER BY used_at DESC LIMIT ?)',
+                (self.max_entries,)
+            )
+        self._connection.close()
@@ -1,12 +1,15 @@
 import csv
+import json
 import logging
 import datetime as dt
 
-from prettytable import PrettyTable
-
 from constants import (
     BASE_DIR,
     DATETIME_FORMAT,
+    FILE_FORMAT_ARROW,
+    FILE_FORMAT_CSV,
+    FILE_FORMAT_JSONL,
+    FILE_FORMAT_PARQUET,
     OUTPUT_PRETTY,
     OUTPUT_FILE,
     RESULTS,
@@ -25,13 +28,16 @@ def control_output(results, cli_args):
 
 
 def default_output(results):
-    """Выводит результаты в стандартном текстовом формате."""
+    """Выводит результаты в стандартном текстовом формате по мере получения."""
     for row in results:
-        print(*row)
+        print(*row, flush=True)
 
 
 def pretty_output(results):
     """Выводит результаты в табличном формате."""
+    from prettytable import PrettyTable
+
+    results = list(results)
     table = PrettyTable()
     table.field_names = results[0]
     table.align = 'l'
@@ -40,15 +46,85 @@ def pretty_output(results):
 
 
 def file_output(results, cli_args):
-    """Сохраняет результаты в CSV-файл."""
+    """Сохраняет результаты в файл формата --file-format (по умолчанию CSV).
+
+    Файл записывает функция из FILE_FORMAT_TO_WRITER.
+    """
+    file_format = getattr(cli_args, 'file_format', None) or FILE_FORMAT_CSV
     results_dir = BASE_DIR / RESULTS
     results_dir.mkdir(exist_ok='True')
     parser_mode = cli_args.mode
     now = dt.datetime.now()
     now_formatted = now.strftime(DATETIME_FORMAT)
-    file_name = f'{parser_mode}_{now_formatted}.csv'
+    file_name = f'{parser_mode}_{now_formatted}.{file_format}'
     file_path = results_dir / file_name
+    FILE_FORMAT_TO_WRITER[file_format](results, file_path)
+    logging.info(f'Файл с результатами был сохранён: {file_path}')
+
+
+def write_csv(results, file_path):
+    """Записывает результаты в CSV-файл.
+
+    Каждая строка записывается на диск сразу после получения, поэтому
+    при сбое в файле остаются уже полученные результаты.
+    """
     with open(file_path, 'w', encoding='utf-8') as f:
         writer = csv.writer(f, dialect='unix')
-        writer.writerows(results)
-    logging.info(f'Файл с результатами был сохранён: {file_path}')
+        for row in results:
+            writer.writerow(row)
+            f.flush()
+
+
+def write_jsonl(results, file_path):
+    """Записывает результаты в JSON Lines: объект на строку.
+
+    Ключи объектов берутся из строки заголовка, значения сохраняют типы.
+    Строки, как и в CSV, записываются по мере получения.
+    """
+    results = iter(results)
+    header = next(results, ())
+    with open(file_path, 'w', encoding='utf-8') as f:
+        for row in results:
+            f.write(json.dumps(dict(zip(header, row)), ensure_ascii=False))
+            f.write('\n')
+            f.flush()
+
+
+def to_arrow_table(results):
+    """Собирает результаты в таблицу pyarrow с колонками из заголовка."""
+    try:
+        import pyarrow
+    except ImportError:
+        raise RuntimeError(
+            'Для форматов parquet и arrow установите пакет pyarrow'
+        )
+    header, *rows = list(results) or [()]
+    columns = list(zip(*rows)) or [()] * len(header)
+    return pyarrow.table({
+        name: list(column) for name, column in zip(header, columns)
+    })
+
+
+def write_parquet(results, file_path):
+    """Записывает результаты в Parquet-файл."""
+    table = to_arrow_table(results)
+    import pyarrow.parquet
+
+    pyarrow.parquet.write_table(table, file_path)
+
+
+def write_arrow(results, file_path):
+    """Записывает результаты в файл Arrow IPC."""
+    table = to_arrow_table(results)
+    import pyarrow
+
+    with pyarrow.ipc.new_file(file_path, table.schema) as writer:
+        writer.write_table(table)
+
+
+FILE_FORMAT_TO_WRITER = {
+    FILE_FORMAT_CSV: write_csv,
+    FILE_FORMAT_JSONL: write_jsonl,
+    FILE_FORMAT_PARQUET: write_parquet,
+    FILE_FORMAT_ARROW: write_arrow,
+}
@@ -0,0 +1,254 @@
+import codecs
+import re
+from importlib.util import find_spec
+
+from constants import (
+    DEFAULT_PARSER,
+    ENCODING_SNIFF_SIZE,
+    PARSER_BS4,
+    PARSER_LXML,
+    PARSER_SELECTOLAX,
+)
+
+PARSER_PACKAGES = {
+    PARSER_BS4: 'bs4',
+    PARSER_LXML: 'lxml',
+    PARSER_SELECTOLAX: 'selectolax',
+}
+
+META_CHARSET_PATTERN = re.compile(
+    rb'<meta\b[^>]*?charset\s*=\s*["\']?\s*([\w.:-]+)', re.IGNORECASE
+)
+
+_current_parser = DEFAULT_PARSER
+
+
+def set_parser(name):
+    """Выбирает библиотеку разбора HTML для parse_html."""
+    global _current_parser
+    if find_spec(PARSER_PACKAGES[name]) is None:
+        raise RuntimeError(
+            f'Для парсера {name} установите пакет {PARSER_PACKAGES[name]}'
+        )
+    _current_parser = name
+
+
+def get_parser():
+    """Возвращает имя выбранной библиотеки разбора HTML."""
+    return _current_parser
+
+
+def parse_html(html, encoding=None):
+    """Разбирает HTML-код выбранной библиотекой и возвращает корень дерева.
+
+    Байты декодируются в кодировке encoding; если она не задана, берётся
+    кодировка из <meta charset> страницы (sniff_encoding).
+    У корня и его элементов одинаковый набор операций: find(tag, attrs),
+    find_all(tag, attrs), text и значение атрибута по ключу, как у тегов
+    BeautifulSoup. В attrs значение True требует наличия атрибута, строка —
+    точного совпадения (для class — одного из классов), регулярное
+    выражение — совпадения при поиске.
+    """
+    if isinstance(html, bytes) and encoding is None:
+        encoding = sniff_encoding(html)
+    return PARSER_TO_FUNCTION[_current_parser](html, encoding)
+
+
+def sniff_encoding(html, default='utf-8'):
+    """Возвращает кодировку, объявленную в <meta> в начале HTML-кода.
+
+    Как и браузеры, смотрит только первые ENCODING_SNIFF_SIZE байт.
+    Если кодировка не объявлена или неизвестна Python, возвращает default.
+    """
+    match = META_CHARSET_PATTERN.search(html[:ENCODING_SNIFF_SIZE])
+    if match:
+        try:
+            return codecs.lookup(match.group(1).decode('ascii')).name
+        except LookupError:
+            pass
+    return default
+
+
+def declared_encoding(headers):
+    """Возвращает кодировку из заголовка Content-Type или None."""
+    from email.message import Message
+
+    message = Message()
+    for name, value in headers.items():
+        if name.lower() == 'content-type':
+            message['Content-Type'] = value
+    return message.get_content_charset()
+
+
+def page_markup(body, encoding):
+    """Возвращает тело страницы для функций извлечения данных.
+
+    Байты отдаются как есть, если sniff_encoding определит по ним ту же
+    кодировку encoding; иначе тело декодируется в encoding с заменой
+    ошибочных байтов, чтобы кодировка ответа не терялась.
+    """
+    if encoding is None:
+        return body
+    try:
+        if codecs.lookup(encoding).name == sniff_encoding(body):
+            return body
+    except LookupError:
+        return body
+    return body.decode(encoding, errors='replace')
+
+
+def make_soup(html, encoding='utf-8', parser='lxml'):
+    """Строит дерево BeautifulSoup, импортируя bs4 при первом разборе.
+
+    Байты передаются парсеру как есть с кодировкой encoding: lxml
+    декодирует их сам, без промежуточной строки Python.
+    """
+    from bs4 import BeautifulSoup
+
+    if isinstance(html, bytes):
+        return BeautifulSoup(html, parser, from_encoding=encoding)
+    return BeautifulSoup(html, parser)
+
+
+def make_lxml_tree(html, encoding='utf-8'):
+    """Строит дерево lxml.html; поиск идёт через XPath."""
+    from lxml import html as lxml_html
+
+    parser = None
+    if isinstance(html, bytes):
+        parser = lxml_html.HTMLParser(encoding=encoding)
+    return LxmlNode(lxml_html.document_fromstring(html, parser=parser))
+
+
+def make_selectolax_tree(html, encoding='utf-8'):
+    """Строит дерево selectolax (lexbor); поиск идёт через CSS-селекторы."""
+    from selectolax.lexbor import LexborHTMLParser
+
+    if isinstance(html, bytes) and encoding.lower() not in ('utf-8', 'utf8'):
+        html = html.decode(encoding)
+    return SelectolaxNode(LexborHTMLParser(html).root)
+
+
+def split_attrs(attrs):
+    """Делит условия на атрибуты на строковые и проверяемые в Python."""
+    simple, patterns = {}, {}
+    for name, value in (attrs or {}).items():
+        if value is True or isinstance(value, str):
+            simple[name] = value
+        else:
+            patterns[name] = value
+    return simple, patterns
+
+
+def matches_patterns(get_attribute, patterns):
+    """Проверяет значения атрибутов регулярными выражениями."""
+    for name, pattern in patterns.items():
+        value = get_attribute(name)
+        if value is None or not pattern.search(value):
+            return False
+    return True
+
+
+class LxmlNode:
+    """Элемент lxml.html с операциями поиска, как у тега BeautifulSoup."""
+
+    def __init__(self, element):
+        self.element = element
+
+    @staticmethod
+    def make_xpath(tag, attrs):
+        conditions = []
+        for name, value in attrs.items():
+            if value is True:
+                conditions.append(f'[@{name}]')
+            elif name == 'class':
+                conditions.append(
+                    '[contains(concat(" ", normalize-space(@class), " "), '
+                    f'{xpath_literal(f" {value} ")}) or @class='
+                    f'{xpath_literal(value)}]'
+                )
+            else:
+                conditions.append(f'[@{name}={xpath_literal(value)}]')
+        return f'.//{tag}{"".join(conditions)}'
+
+    def find_all(self, tag, attrs=None):
+        simple, patterns = split_attrs(attrs)
+        return [
+            LxmlNode(element)
+            for element in self.element.xpath(self.make_xpath(tag, simple))
+            if matches_patterns(element.get, patterns)
+        ]
+
+    def find(self, tag, attrs=None):
+        found = self.find_all(tag, attrs)
+        return found[0] if found else None
+
+    @property
+    def text(self):
+        return self.element.text_content()
+
+    def get(self, name, default=None):
+        return self.element.get(name, default)
+
+    def __getitem__(self, name):
+        return self.element.attrib[name]
+
+
+class SelectolaxNode:
+    """Элемент selectolax с операциями поиска, как у тега BeautifulSoup."""
+
+    def __init__(self, node):
+        self.node = node
+
+    @staticmethod
+    def make_selector(tag, attrs):
+        conditions = []
+        for name, value in attrs.items():
+            if value is True:
+                conditions.append(f'[{name}]')
+            else:
+                operator = '~=' if name == 'class' else '='
+                conditions.append(f'[{name}{operator}{css_literal(value)}]')
+        return tag + ''.join(conditions)
+
+    def find_all(self, tag, attrs=None):
+        simple, patterns = split_attrs(attrs)
+        return [
+            SelectolaxNode(node)
+            for node in self.node.css(self.make_selector(tag, simple))
+            if node != self.node
+            and matches_patterns(node.attributes.get, patterns)
+        ]
+
+    def find(self, tag, attrs=None):
+        found = self.find_all(tag, attrs)
+        return found[0] if found else None
+
+    @property
+    def text(self):
+        return self.node.text(deep=True)
+
+    def get(self, name, default=None):
+        return self.node.attributes.get(name, default)
+
+    def __getitem__(self, name):
+        return self.node.attributes[name]
+
+
+def xpath_literal(value):
+    """Записывает строку литералом XPath."""
+    if '"' not in value:
+        return f'"{value}"'
+    return f"'{value}'"
+
+
+def css_literal(value):
+    """Записывает строку литералом CSS."""
+    return '"{}"'.format(value.replace('\\', '\\\\').replace('"', '\\"'))
+
+
+PARSER_TO_FUNCTION = {
+    PARSER_BS4: make_soup,
+    PARSER_LXML: make_lxml_tree,
+    PARSER_SELECTOLAX: make_selectolax_tree,
+}
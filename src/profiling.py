@@ -0,0 +1,113 @@
+import json
+import time
+from collections import Counter, defaultdict
+from contextlib import contextmanager, nullcontext
+from threading import Lock
+
+NULL_CONTEXT = nullcontext()
+
+
+def percentile(values, fraction):
+    """Перцентиль отсортированного списка по методу ближайшего ранга."""
+    index = max(0, min(len(values) - 1, round(fraction * len(values)) - 1))
+    return values[index]
+
+
+class Profiler:
+    """Собирает длительности этапов работы парсера и счётчики.
+
+    Пока профилирование не включено, stage() возвращает общий пустой
+    контекстный менеджер, а count() и timed() ничего не делают.
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self.timings = defaultdict(list)
+        self.counters = Counter()
+        self._lock = Lock()
+
+    def enable(self):
+        self.enabled = True
+
+    def stage(self, name):
+        """Контекстный менеджер, замеряющий длительность этапа name."""
+        if not self.enabled:
+            return NULL_CONTEXT
+        return self._measure(name)
+
+    @contextmanager
+    def _measure(self, name):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, time.perf_counter() - started)
+
+    def record(self, name, duration):
+        with self._lock:
+            self.timings[name].append(duration)
+
+    def count(self, name, value=1):
+        if self.enabled:
+            with self._lock:
+                self.counters[name] += value
+
+    def timed(self, name, iterable):
+        """Замеряет время получения каждого элемента итератора."""
+        if not self.enabled:
+            return iterable
+        return self._timed(name, iterable)
+
+    def _timed(self, name, iterable):
+        iterator = iter(iterable)
+        while True:
+            started = time.perf_counter()
+            try:
+                item = next(iterator)
+            except StopIteration:
+                return
+            self.record(name, time.perf_counter() - started)
+            yield item
+
+    def summary(self):
+        """Возвращает сводку: для этапов — число, сумма, p50, p95, max."""
+        stages = {}
+        for name, durations in self.timings.items():
+            durations = sorted(durations)
+            stages[name] = {
+                'count': len(durations),
+                'total_s': sum(durations),
+                'p50_ms': percentile(durations, 0.5) * 1000,
+                'p95_ms': percentile(durations, 0.95) * 1000,
+                'max_ms': durations[-1] * 1000,
+            }
+        return {'stages': stages, 'counters': dict(self.counters)}
+
+    def print_summary(self):
+        from prettytable import PrettyTable
+
+        summary = self.summary()
+        table = PrettyTable()
+        table.field_names = (
+            'Этап', 'Вызовов', 'Всего, с', 'p50, мс', 'p95, мс', 'max, мс'
+        )
+        table.align = 'l'
+        for name, stage in summary['stages'].items():
+            table.add_row((
+                name,
+                stage['count'],
+                f"{stage['total_s']:.3f}",
+                f"{stage['p50_ms']:.2f}",
+                f"{stage['p95_ms']:.2f}",
+                f"{stage['max_ms']:.2f}",
+            ))
+        print(table)
+        for name, value in summary['counters'].items():
+            print(f'{name}: {value}')
+
+    def dump_json(self, path):
+        with open(path, 'w', encoding='utf-8') as file:
+            json.dump(self.summary(), file, ensure_ascii=False, indent=2)
+
+
+profiler = Profiler()
@@ -0,0 +1,122 @@
+import time
+from threading import Lock
+from urllib.parse import urlsplit
+
+from requests.adapters import HTTPAdapter
+
+from constants import (
+    RATE_DECREASE_FACTOR,
+    RATE_INCREASE_FRACTION,
+    RATE_LIMITED_STATUSES,
+    RATE_MIN,
+)
+
+
+class TokenBucket:
+    """Ограничитель частоты запросов по алгоритму «ведро с токенами».
+
+    Ведро пополняется со скоростью rate токенов в секунду и вмещает не
+    больше burst токенов. reserve() забирает токен, уходя при нехватке
+    в долг, и возвращает, сколько секунд нужно подождать до запроса.
+    """
+
+    def __init__(self, rate, burst, clock=time.monotonic):
+        self.max_rate = self.rate = rate
+        self.burst = burst
+        self._clock = clock
+        self._tokens = burst
+        self._updated = clock()
+        self._lock = Lock()
+
+    def reserve(self):
+        """Забирает токен и возвращает задержку перед запросом в секундах."""
+        with self._lock:
+            now = self._clock()
+            self._tokens = min(
+                self.burst, self._tokens + (now - self._updated) * self.rate
+            )
+            self._updated = now
+            self._tokens -= 1
+            return max(0.0, -self._tokens / self.rate)
+
+    def slow_down(self):
+        """Уменьшает частоту запросов после ответа 429/503."""
+        with self._lock:
+            self.rate = max(RATE_MIN, self.rate * RATE_DECREASE_FACTOR)
+
+    def speed_up(self):
+        """Постепенно возвращает частоту к исходной после успешного ответа."""
+        with self._lock:
+            self.rate = min(
+                self.max_rate,
+                self.rate + self.max_rate * RATE_INCREASE_FRACTION
+            )
+
+
+class RateLimiter:
+    """Набор ограничителей частоты запросов по хостам.
+
+    limits — словарь {хост: (запросов в секунду, burst)}; ключ None
+    задаёт ограничение для остальных хостов. Хосты без ограничения
+    не задерживаются.
+    """
+
+    def __init__(self, limits, clock=time.monotonic):
+        self.limits = limits
+        self._clock = clock
+        self._buckets = {}
+        self._lock = Lock()
+
+    def get_bucket(self, url):
+        host = urlsplit(url).hostname
+        with self._lock:
+            if host not in self._buckets:
+                limit = self.limits.get(host, self.limits.get(None))
+                self._buckets[host] = limit and TokenBucket(
+                    *limit, clock=self._clock
+                )
+            return self._buckets[host]
+
+    def reserve(self, url):
+        """Возвращает задержку в секундах перед запросом к url."""
+        bucket = self.get_bucket(url)
+        return bucket.reserve() if bucket else 0.0
+
+    def wait(self, url):
+        time.sleep(self.reserve(url))
+
+    def report(self, url, statuses):
+        """Подстраивает частоту запросов к хосту по кодам ответов."""
+        bucket = self.get_bucket(url)
+        if not bucket:
+            return
+        if RATE_LIMITED_STATUSES & set(statuses):
+            bucket.slow_down()
+        else:
+            bucket.speed_up()
+
+
+class RateLimitedAdapter(HTTPAdapter):
+    """HTTP-адаптер, ограничивающий частоту запросов к хостам.
+
+    Перед отправкой запроса адаптер ждёт, сколько велит rate_limiter.
+    Ограничитель видит и ответы повторных попыток urllib3, поэтому 429/503,
+    обработанные повтором, тоже снижают частоту запросов.
+    """
+
+    def __init__(self, *args, rate_limiter=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.rate_limiter = rate_limiter
+
+    def send(self, request, *args, **kwargs):
+        if self.rate_limiter is None:
+            return super().send(request, *args, **kwargs)
+        self.rate_limiter.wait(request.url)
+        response = super().send(request, *args, **kwargs)
+        retries = getattr(response.raw, 'retries', None)
+        history = retries.history if retries else ()
+        self.rate_limiter.report(
+            request.url,
+            [attempt.status for attempt in history] + [response.status_code]
+        )
+        return response
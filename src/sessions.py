@@ -0,0 +1,259 @@
+import heapq
+import logging
+from collections import Counter
+from threading import Lock
+
+from requests_cache import (
+    NEVER_EXPIRE,
+    CachedSession,
+    FileCache,
+    FileDict,
+    RedisCache,
+    SQLiteCache,
+    SQLiteDict,
+)
+from urllib3.util.retry import Retry
+
+from coalescing import RequestCoalescer
+from compression import create_serializer
+from constants import (
+    CACHE_FILESYSTEM,
+    CACHE_HIT,
+    CACHE_MEMORY,
+    CACHE_MISS,
+    CACHE_NAME,
+    CACHE_REDIS,
+    CACHE_REVALIDATED,
+    CACHE_SQLITE,
+    COMPRESSION_NONE,
+    DEFAULT_TIMEOUT,
+    RETRY_BACKOFF_FACTOR,
+    RETRY_STATUSES,
+    SQLITE_BUSY_TIMEOUT,
+)
+from memo import ExtractionMemo
+from ratelimit import RateLimitedAdapter, RateLimiter
+
+try:
+    from redis import Redis
+except ImportError:
+    Redis = None
+
+
+class ParserSession(CachedSession):
+    """Кеширующая HTTP-сессия, которая ведёт статистику обращений к кешу."""
+
+    def __init__(
+        self,
+        *args,
+        memo=None,
+        timeout=DEFAULT_TIMEOUT,
+        rate_limiter=None,
+        cache_max_entries=None,
+        coalescer=None,
+        replay=None,
+        **kwargs
+    ):
+        super().__init__(*args, **kwargs)
+        # Кеш результатов извлечения (ExtractionMemo) для crawl.
+        self.memo = memo
+        self.timeout = timeout
+        # Ограничитель частоты для загрузок в обход адаптеров requests.
+        self.rate_limiter = rate_limiter
+        self.cache_max_entries = cache_max_entries
+        # Память ответов на время запуска (RequestCoalescer).
+        self.coalescer = coalescer
+        # Архив снимка (SnapshotArchive), из которого отдаются ответы.
+        self.replay = replay
+        self.cache_stats = Counter()
+        self._stats_lock = Lock()
+
+    def request(self, method, url, *args, **kwargs):
+        """Выполняет запрос с таймаутом сессии, если timeout не задан."""
+        kwargs.setdefault('timeout', self.timeout)
+        return super().request(method, url, *args, **kwargs)
+
+    def send(self, request, **kwargs):
+        response = super().send(request, **kwargs)
+        if getattr(response, 'revalidated', False):
+            status = CACHE_REVALIDATED
+        elif getattr(response, 'from_cache', False):
+            status = CACHE_HIT
+        else:
+            status = CACHE_MISS
+        self.count_cache_status(status)
+        return response
+
+    def count_cache_status(self, status):
+        """Учитывает обращение к кешу: CACHE_HIT, CACHE_MISS и т. д."""
+        with self._stats_lock:
+            self.cache_stats[status] += 1
+
+    def log_cache_stats(self):
+        """Выводит в лог число попаданий, промахов и перепроверок кеша."""
+        logging.info(
+            'HTTP-кеш: попаданий %s, промахов %s, перепроверено %s',
+            self.cache_stats[CACHE_HIT],
+            self.cache_stats[CACHE_MISS],
+            self.cache_stats[CACHE_REVALIDATED],
+        )
+        if self.memo is not None:
+            logging.info(
+                'Кеш разбора страниц: попаданий %s, промахов %s',
+                self.memo.hits,
+                self.memo.misses,
+            )
+        if self.coalescer is not None:
+            logging.info(
+                'Повторных загрузок не выполнено: %s '
+                '(из памяти %s, объединено с выполняющимися %s)',
+                self.coalescer.duplicates,
+                self.coalescer.hits,
+                self.coalescer.coalesced,
+            )
+
+    def evict_cache(self):
+        """Удаляет из HTTP-кеша самые старые ответы сверх лимита."""
+        if self.cache_max_entries is None:
+            return
+        responses = self.cache.responses
+        excess = len(responses) - self.cache_max_entries
+        if excess <= 0:
+            return
+        self.cache.delete(*oldest_cache_keys(responses, excess))
+        logging.info('Из HTTP-кеша удалено старых ответов: %s', excess)
+
+    def close(self):
+        if self.memo is not None:
+            self.memo.close()
+            self.memo = None
+        self.evict_cache()
+        super().close()
+
+
+def oldest_cache_keys(responses, count):
+    """Возвращает ключи count ответов, раньше всех записанных в кеш.
+
+    Для SQLite и файлового кеша ответы не читаются: порядок записи дают
+    rowid строки (перезапись ответа выдаёт новый rowid) и время изменения
+    файла. В памяти ответы хранятся без сериализации, поэтому берётся
+    их created_at; так же, с чтением ответов, обрабатывается Redis.
+    """
+    if isinstance(responses, SQLiteDict):
+        with responses.connection() as connection:
+            return [
+                row[0] for row in connection.execute(
+                    f'SELECT key FROM {responses.table_name} '
+                    'ORDER BY rowid LIMIT ?',
+                    (count,)
+                )
+            ]
+    if isinstance(responses, FileDict):
+        return [
+            path.stem for path in heapq.nsmallest(
+                count, responses.paths(),
+                key=lambda path: path.stat().st_mtime_ns
+            )
+        ]
+    oldest = heapq.nsmallest(
+        count, responses.items(), key=lambda item: item[1].created_at
+    )
+    return [key for key, _ in oldest]
+
+
+def create_adapter(pool_size, retries, rate_limiter=None):
+    """Создаёт HTTP-адаптер с пулом соединений и повтором запросов.
+
+    Запросы, завершившиеся ошибкой соединения или ответом 429/5xx,
+    повторяются с экспоненциальной задержкой; заголовок Retry-After
+    учитывается. После исчерпания попыток возвращается последний ответ.
+    Частота запросов к хостам ограничивается rate_limiter, если он задан.
+    """
+    retry = Retry(
+        total=retries,
+        backoff_factor=RETRY_BACKOFF_FACTOR,
+        status_forcelist=RETRY_STATUSES,
+        allowed_methods=('GET', 'HEAD'),
+        respect_retry_after_header=True,
+        raise_on_status=False,
+    )
+    return RateLimitedAdapter(
+        pool_connections=pool_size,
+        pool_maxsize=pool_size,
+        max_retries=retry,
+        rate_limiter=rate_limiter,
+    )
+
+
+def create_cache_backend(backend, redis_url, serializer=None):
+    """Создаёт хранилище HTTP-кеша по имени из --cache-backend.
+
+    SQLite работает в режиме WAL: чтения не блокируются записью, а
+    параллельные записи ждут освобождения базы до SQLITE_BUSY_TIMEOUT мс.
+    serializer заменяет сериализатор хранилища по умолчанию; кеш в памяти
+    ответы не сериализует.
+    """
+    options = {'serializer': serializer} if serializer else {}
+    if backend == CACHE_SQLITE:
+        return SQLiteCache(
+            CACHE_NAME, wal=True, busy_timeout=SQLITE_BUSY_TIMEOUT, **options
+        )
+    if backend == CACHE_FILESYSTEM:
+        return FileCache(CACHE_NAME, **options)
+    if backend == CACHE_REDIS:
+        if Redis is None:
+            raise RuntimeError('Для кеша в Redis установите пакет redis')
+        return RedisCache(
+            CACHE_NAME, connection=Redis.from_url(redis_url), **options
+        )
+    return backend
+
+
+def create_session(cli_args):
+    """Создаёт HTTP-сессию парсера по аргументам командной строки."""
+    rate_limiter = cli_args.rate_limit and RateLimiter({
+        host: (rate, burst) for host, rate, burst in cli_args.rate_limit
+    })
+    serializer = None
+    if cli_args.cache_compression != COMPRESSION_NONE:
+        serializer = create_serializer(
+            cli_args.cache_compression, cli_args.cache_compression_level
+        )
+    replay = None
+    if cli_args.replay:
+        from snapshots import ReplayAdapter, SnapshotArchive
+
+        replay = SnapshotArchive(cli_args.replay, readonly=True)
+    # При воспроизведении HTTP-кеш держится в памяти, чтобы ответы с диска
+    # не подменяли записанные в архиве.
+    session = ParserSession(
+        backend=create_cache_backend(
+            CACHE_MEMORY if cli_args.replay else cli_args.cache_backend,
+            cli_args.redis_url,
+            serializer,
+        ),
+        expire_after=cli_args.cache_ttl or NEVER_EXPIRE,
+        cache_max_entries=cli_args.cache_max_entries,
+        always_revalidate=cli_args.revalidate,
+        memo=None if cli_args.no_memo else ExtractionMemo(),
+        timeout=cli_args.timeout,
+        rate_limiter=rate_limiter,
+        coalescer=RequestCoalescer(),
+        replay=replay,
+    )
+    if cli_args.replay:
+        adapter = ReplayAdapter(replay)
+    else:
+        # Пул соединений не меньше числа параллельных загрузок.
+        adapter = create_adapter(
+            max(cli_args.pool_size, cli_args.workers),
+            cli_args.retries,
+            rate_limiter,
+        )
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    if cli_args.clear_cache:
+        session.cache.clear()
+        if session.memo is not None:
+            session.memo.clear()
+    return session
@@ -0,0 +1,144 @@
+import json
+import sqlite3
+import zlib
+from http import HTTPStatus
+from io import BytesIO
+from threading import Lock
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3 import HTTPResponse
+
+from constants import BODY_ENCODING_HEADERS, SNAPSHOT_COMPRESSION_LEVEL
+
+
+class SnapshotArchive:
+    """Архив HTTP-ответов в одном файле SQLite.
+
+    Ответ хранится по ссылке запроса: код, заголовки в JSON и тело,
+    сжатое zlib. Перенаправления записываются отдельными ответами, так что
+    при воспроизведении requests проходит их так же, как при загрузке.
+    Повторная запись ссылки заменяет прежний ответ. Архив можно
+    пополнять из нескольких потоков; с readonly=True файл должен уже
+    существовать.
+    """
+
+    def __init__(self, path, readonly=False):
+        self.path = path
+        if readonly and not path.exists():
+            raise RuntimeError(f'Архив снимка не найден: {path}')
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        self._connection.execute(
+            'CREATE TABLE IF NOT EXISTS responses ('
+            'url TEXT PRIMARY KEY, status INTEGER, headers TEXT, body BLOB)'
+        )
+        self._lock = Lock()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def __len__(self):
+        with self._lock:
+            return self._connection.execute(
+                'SELECT COUNT(*) FROM responses'
+            ).fetchone()[0]
+
+    def add(self, url, status, headers, body):
+        """Записывает в архив ответ на запрос url."""
+        headers = {
+            name: value for name, value in headers.items()
+            if name.lower() not in BODY_ENCODING_HEADERS
+        }
+        headers['Content-Length'] = str(len(body))
+        with self._lock, self._connection:
+            self._connection.execute(
+                'INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?)',
+                (
+                    url,
+                    status,
+                    json.dumps(headers, ensure_ascii=False),
+                    zlib.compress(body, SNAPSHOT_COMPRESSION_LEVEL),
+                )
+            )
+
+    def record(self, response, *args, **kwargs):
+        """Перехватчик ответов сессии requests, записывающий их в архив.
+
+        Части файлов (ответ 206) не записываются: при воспроизведении
+        файл отдаётся целиком.
+        """
+        if response.status_code != HTTPStatus.PARTIAL_CONTENT:
+            self.add(
+                response.request.url,
+                response.status_code,
+                response.headers,
+                response.content,
+            )
+        return response
+
+    def get(self, url):
+        """Возвращает (код, заголовки, тело) ответа или None."""
+        with self._lock:
+            row = self._connection.execute(
+                'SELECT status, headers, body FROM responses WHERE url = ?',
+                (url,)
+            ).fetchone()
+        if row is None:
+            return None
+        status, headers, body = row
+        return status, json.loads(headers), zlib.decompress(body)
+
+    def urls(self):
+        """Возвращает ссылки записанных ответов."""
+        with self._lock:
+            return [
+                row[0] for row in self._connection.execute(
+                    'SELECT url FROM responses ORDER BY url'
+                )
+            ]
+
+    def close(self):
+        self._connection.close()
+
+
+class ReplayAdapter(HTTPAdapter):
+    """HTTP-адаптер, отдающий ответы из архива снимка без обращения к сети.
+
+    Ссылка, которой нет в архиве, приводит к ConnectionError, как
+    недоступный сервер. Адаптер закрывает архив вместе с сессией.
+    """
+
+    def __init__(self, archive):
+        super().__init__()
+        self.archive = archive
+
+    def send(self, request, stream=False, timeout=None, verify=True,
+             cert=None, proxies=None):
+        entry = self.archive.get(request.url)
+        if entry is None:
+            raise requests.ConnectionError(
+                f'Ссылки нет в архиве {self.archive.path}: {request.url}',
+                request=request,
+            )
+        status, headers, body = entry
+        try:
+            reason = HTTPStatus(status).phrase
+        except ValueError:
+            reason = None
+        raw = HTTPResponse(
+            body=BytesIO(body),
+            headers=headers,
+            status=status,
+            reason=reason,
+            preload_content=False,
+            decode_content=False,
+        )
+        return self.build_response(request, raw)
+
+    def close(self):
+        super().close()
+        self.archive.close()
@@ -0,0 +1,54 @@
+import sqlite3
+from contextlib import closing
+
+from constants import PEP_STATE_PATH
+from utils import PepRecord
+
+
+class PepState:
+    """Строки индекса PEP и статусы из карточек, сохранённые между запусками.
+
+    Ключ записи — PepRecord из parse_pep_list, поэтому смена букв типа
+    или статуса в индексе или ссылки делает запись недействительной.
+    """
+
+    def __init__(self, path=PEP_STATE_PATH):
+        self.path = path
+
+    def _connect(self):
+        self.path.parent.mkdir(exist_ok=True)
+        connection = sqlite3.connect(self.path)
+        connection.execute(
+            'CREATE TABLE IF NOT EXISTS peps ('
+            'second_letter TEXT, pep_number TEXT, pep_url TEXT, status TEXT, '
+            "type_letter TEXT NOT NULL DEFAULT '', "
+            'PRIMARY KEY (pep_number, second_letter, pep_url))'
+        )
+        columns = {
+            row[1] for row in connection.execute('PRAGMA table_info(peps)')
+        }
+        if 'type_letter' not in columns:
+            connection.execute(
+                'ALTER TABLE peps '
+                "ADD COLUMN type_letter TEXT NOT NULL DEFAULT ''"
+            )
+        return connection
+
+    def load(self):
+        """Возвращает словарь {строка индекса: статус из карточки}."""
+        with closing(self._connect()) as connection:
+            rows = connection.execute(
+                'SELECT pep_number, pep_url, type_letter, second_letter, '
+                'status FROM peps'
+            )
+            return {PepRecord(*row[:4]): row[4] for row in rows}
+
+    def save(self, statuses):
+        """Заменяет сохранённое состояние словарем {строка индекса: статус}."""
+        with closing(self._connect()) as connection, connection:
+            connection.execute('DELETE FROM peps')
+            connection.executemany(
+                'INSERT INTO peps (pep_number, pep_url, type_letter, '
+                'second_letter, status) VALUES (?, ?, ?, ?, ?)',
+                [(*pep_link, status) for pep_link, status in statuses.items()]
+            )
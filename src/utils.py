@@ -1,14 +1,33 @@
 import csv
 import logging
-from collections import Counter
+import re
+from collections import Counter, namedtuple
+from contextlib import closing
+from functools import wraps
+from html import unescape
+from http import HTTPStatus
 from urllib.parse import urljoin
 
-from bs4 import BeautifulSoup
-from requests import RequestException
-from tqdm import tqdm
-
-from constants import PEP_DOC_URL, EXPECTED_STATUS, RESULTS_DIR
+from constants import (
+    DEFAULT_PARSE_WORKERS,
+    DEFAULT_WORKERS,
+    DOWNLOAD_CHUNK_SIZE,
+    ENGINE_THREADS,
+    EXPECTED_STATUS,
+    NO_STORE_HEADERS,
+    PEP_DOC_URL,
+    RESULTS_DIR,
+    STREAM_CHUNK_SIZE,
+)
+from crawler import crawl, get_cached_content
 from exceptions import ParserFindTagException, RequestError
+from parsers import (
+    declared_encoding,
+    page_markup,
+    parse_html,
+    sniff_encoding,
+)
+from profiling import profiler
 
 
 logging.basicConfig(
@@ -17,32 +36,313 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+PARTIAL_CONTENT = HTTPStatus.PARTIAL_CONTENT
+RANGE_NOT_SATISFIABLE = HTTPStatus.REQUESTED_RANGE_NOT_SATISFIABLE
+
+PEP_INDEX_SECTION_ID = 'index-by-category'
+CONTENT_RANGE_PATTERN = re.compile(r'bytes (?:(\d+)-\d+|\*)/(\d+|\*)')
+
+
+class PepRecord(
+    namedtuple('PepRecord', ('number', 'url', 'type_letter', 'status_letter'))
+):
+    """Строка индекса PEP.
+
+    number и url — номер PEP и ссылка на карточку, type_letter и
+    status_letter — буквы типа и статуса из первого столбца (S и A для «SA»).
+    """
+
+    __slots__ = ()
+
+
+# Комментарий или открывающий тег <abbr>; знак > в кавычках значения
+# атрибута тег не закрывает.
+ABBR_OPEN_PATTERN = re.compile(
+    rb'<!--.*?-->|<abbr\b((?:[^>"\']|"[^"]*"|\'[^\']*\')*)>',
+    re.IGNORECASE | re.DOTALL
+)
+QUOTED_VALUE_PATTERN = re.compile(rb'"[^"]*"|\'[^\']*\'')
+TITLE_ATTRIBUTE_PATTERN = re.compile(rb'\stitle(?![\w-])', re.IGNORECASE)
+ABBR_TEXT_PATTERN = re.compile(rb'([^<]*)</abbr\s*>', re.IGNORECASE)
+
+
+def streaming(rows_function):
+    """Превращает генератор строк результата в функцию режима.
+
+    Обёрнутая функция возвращает список строк, а сам генератор доступен
+    в атрибуте rows: через него строки попадают в вывод по мере получения.
+    """
+    @wraps(rows_function)
+    def mode_function(*args, **kwargs):
+        return list(rows_function(*args, **kwargs))
+
+    mode_function.rows = rows_function
+    return mode_function
+
+
+def get_response(session, url, encoding=None):
+    """Выполняет GET-запрос и возвращает объект ответа.
+
+    Кодировка ответа — encoding, если она задана, иначе charset из
+    заголовка Content-Type, иначе объявленная в <meta> страницы (UTF-8,
+    если её нет). Сетевые ошибки и ответы с кодом 4xx/5xx превращаются
+    в RequestError.
+    Если у сессии есть память ответов (session.coalescer), каждая ссылка
+    загружается за запуск один раз, а одновременные запросы одной ссылки
+    объединяются.
+    """
+    coalescer = getattr(session, 'coalescer', None)
+    if coalescer is None:
+        return fetch_response(session, url, encoding)
+    return coalescer.get(
+        (url, encoding), lambda: fetch_response(session, url, encoding)
+    )
+
+
+def fetch_response(session, url, encoding):
+    """Загружает страницу через сессию для get_response."""
+    from requests import RequestException
 
-def get_response(session, url, encoding='utf-8'):
-    """Выполняет GET-запрос и возвращает объект ответа."""
     try:
-        response = session.get(url)
-        response.encoding = encoding
+        with profiler.stage('fetch'):
+            response = session.get(url)
+        response.raise_for_status()
+        response.encoding = (
+            encoding
+            or declared_encoding(response.headers)
+            or sniff_encoding(response.content)
+        )
+        if profiler.enabled:
+            profiler.count('bytes', len(response.content))
+            profiler.count(
+                'cache_hits' if getattr(response, 'from_cache', False)
+                else 'cache_misses'
+            )
         return response
     except RequestException as error:
         raise RequestError(f'Ошибка при загрузке страницы {url}: {error}')
 
 
-def get_soup(session, url, parser='lxml'):
-    """Получает HTML-страницу и возвращает объект BeautifulSoup."""
+def get_page(session, url):
+    """Загружает страницу и возвращает её HTML-код."""
+    return get_response(session, url).text
+
+
+def get_content(session, url):
+    """Загружает страницу и возвращает её тело для функций извлечения.
+
+    Тело отдаётся в байтах без декодирования, если его кодировка
+    определяется по <meta> (page_markup), иначе строкой.
+    """
     response = get_response(session, url)
-    return BeautifulSoup(response.text, parser)
+    return page_markup(response.content, response.encoding)
+
+
+def get_soup(session, url):
+    """Получает HTML-страницу и возвращает корень её дерева.
+
+    Дерево строит библиотека, выбранная флагом --parser (parse_html).
+    """
+    response = get_response(session, url)
+    with profiler.stage('parse'):
+        return parse_html(response.content, response.encoding)
 
 
 def find_tag(soup, tag, attrs=None):
     """Ищет тег в HTML-дереве, выбрасывает исключение, если не найден."""
-    searched_tag = soup.find(tag, attrs=(attrs or {}))
+    with profiler.stage('find_tag'):
+        searched_tag = soup.find(tag, attrs=(attrs or {}))
     if searched_tag is None:
         error_msg = f'Не найден тег {tag} {attrs}'
         raise ParserFindTagException(error_msg)
     return searched_tag
 
 
+def extract_whats_new(html):
+    """Извлекает заголовок и сведения об авторах из статьи «Что нового».
+
+    html — HTML-код статьи в байтах (в кодировке из <meta charset>, по
+    умолчанию UTF-8) или строкой.
+    """
+    soup = parse_html(html)
+    h1 = find_tag(soup, 'h1')
+    dl = find_tag(soup, 'dl')
+    return h1.text, dl.text.replace('\n', ' ')
+
+
+def iter_page_elements(session, url, tags, chunk_size=STREAM_CHUNK_SIZE):
+    """Загружает страницу потоком и отдаёт закрытые элементы с тегами tags.
+
+    Куски ответа подаются в инкрементальный парсер lxml по мере загрузки,
+    поэтому элементы отдаются до конца страницы. Кодировка берётся из
+    заголовка Content-Type или из <meta> в первом куске. Закрытие
+    генератора обрывает загрузку. Запрос идёт мимо HTTP-кеша
+    (NO_STORE_HEADERS): иначе кеш дочитал бы ответ целиком.
+    """
+    from lxml import etree
+    from requests import RequestException
+
+    parser = None
+    try:
+        with session.get(
+            url, headers=NO_STORE_HEADERS, stream=True
+        ) as response:
+            response.raise_for_status()
+            for chunk in response.iter_content(chunk_size=chunk_size):
+                profiler.count('bytes', len(chunk))
+                if parser is None:
+                    parser = etree.HTMLPullParser(
+                        events=('end',), tag=tags,
+                        encoding=(
+                            declared_encoding(response.headers)
+                            or sniff_encoding(chunk)
+                        ),
+                    )
+                parser.feed(chunk)
+                for _, element in parser.read_events():
+                    yield element
+    except RequestException as error:
+        raise RequestError(f'Ошибка при загрузке страницы {url}: {error}')
+
+
+def element_text(element):
+    """Возвращает текст элемента lxml вместе с вложенными тегами."""
+    return ''.join(element.itertext())
+
+
+def stream_whats_new(session, url):
+    """Потоково загружает статью «Что нового» до первых <h1> и <dl>.
+
+    Возвращает то же, что extract_whats_new. Страница из HTTP-кеша
+    разбирается целиком без загрузки.
+    """
+    html = get_cached_content(session, url)
+    if html is not None:
+        return extract_whats_new(html)
+    found = {}
+    with profiler.stage('fetch'), closing(
+        iter_page_elements(session, url, ('h1', 'dl'))
+    ) as elements:
+        for element in elements:
+            found.setdefault(element.tag, element)
+            if len(found) == 2:
+                break
+    for tag in ('h1', 'dl'):
+        if tag not in found:
+            raise ParserFindTagException(f'Не найден тег {tag} None')
+    return (
+        element_text(found['h1']),
+        element_text(found['dl']).replace('\n', ' '),
+    )
+
+
+def download_file(session, url, file_path, chunk_size=DOWNLOAD_CHUNK_SIZE):
+    """Скачивает файл по частям, не держа его целиком в памяти.
+
+    Данные пишутся во временный файл <имя>.part, который после загрузки
+    атомарно переименовывается. Если .part остался от прерванной загрузки,
+    скачивание продолжается с места обрыва через заголовок Range, а
+    If-Range с ETag или Last-Modified первой загрузки (файл
+    <имя>.part.validator) не даёт дописать к нему части изменившегося
+    файла. Если размер .part не сходится с размером файла на сервере,
+    .part удаляется и файл скачивается заново. Запрос идёт мимо HTTP-кеша
+    (NO_STORE_HEADERS).
+    """
+    from requests import RequestException
+
+    part_path = file_path.with_name(file_path.name + '.part')
+    validator_path = part_path.with_name(part_path.name + '.validator')
+    for _ in range(2):
+        if download_part(session, url, part_path, validator_path, chunk_size):
+            part_path.replace(file_path)
+            validator_path.unlink(missing_ok=True)
+            return file_path
+        logger.warning(
+            "Недокачанный файл %s не совпадает с файлом на сервере, "
+            "он будет скачан заново", part_path
+        )
+        part_path.unlink(missing_ok=True)
+        validator_path.unlink(missing_ok=True)
+    raise RequestException(
+        f'Размер файла {url} не совпадает с размером на сервере'
+    )
+
+
+def download_part(session, url, part_path, validator_path, chunk_size):
+    """Докачивает файл в part_path и проверяет его размер.
+
+    Возвращает False, если .part нельзя продолжить или его размер не
+    совпадает с заявленным сервером в Content-Range или Content-Length.
+    """
+    from tqdm import tqdm
+
+    downloaded = part_path.stat().st_size if part_path.exists() else 0
+    validator = validator_path.read_text() if validator_path.exists() else ''
+    headers = {}
+    if downloaded and validator:
+        headers = {'Range': f'bytes={downloaded}-', 'If-Range': validator}
+
+    with session.get(
+        url, headers={**NO_STORE_HEADERS, **headers}, stream=True
+    ) as response:
+        start, total = parse_content_range(
+            response.headers.get('Content-Range')
+        )
+        if response.status_code == RANGE_NOT_SATISFIABLE and headers:
+            return total == downloaded
+        response.raise_for_status()
+        if response.status_code != PARTIAL_CONTENT or not headers:
+            downloaded = 0
+            total = int(response.headers.get('Content-Length', 0)) or None
+            save_validator(validator_path, response.headers)
+        elif start != downloaded:
+            return False
+        with open(part_path, 'ab' if downloaded else 'wb') as file, tqdm(
+            total=total,
+            initial=downloaded,
+            unit='B',
+            unit_scale=True,
+            unit_divisor=1024,
+            desc=part_path.name,
+        ) as progress:
+            for chunk in response.iter_content(chunk_size=chunk_size):
+                file.write(chunk)
+                progress.update(len(chunk))
+
+    return total is None or part_path.stat().st_size == total
+
+
+def parse_content_range(value):
+    """Возвращает начало диапазона и полный размер из Content-Range.
+
+    Неизвестные значения (в том числе «*») возвращаются как None.
+    """
+    match = CONTENT_RANGE_PATTERN.fullmatch((value or '').strip())
+    if match is None:
+        return None, None
+    start, total = match.groups()
+    return (
+        int(start) if start else None,
+        int(total) if total.isdigit() else None,
+    )
+
+
+def save_validator(validator_path, headers):
+    """Сохраняет ETag или Last-Modified ответа для заголовка If-Range.
+
+    Слабый ETag в If-Range не допускается, вместо него берётся
+    Last-Modified; без подходящего значения докачка будет невозможна.
+    """
+    etag = headers.get('ETag', '')
+    validator = etag if etag and not etag.startswith('W/') else (
+        headers.get('Last-Modified', '')
+    )
+    if validator:
+        validator_path.write_text(validator)
+    else:
+        validator_path.unlink(missing_ok=True)
+
+
 def save_to_csv(status_counts, filename='pep_summary.csv'):
     """Сохраняет данные в CSV-файл."""
     RESULTS_DIR.mkdir(exist_ok=True)
@@ -57,66 +357,278 @@ def save_to_csv(status_counts, filename='pep_summary.csv'):
     print(f"Файл сохранён в: {file_path}")
 
 
+def find_pep_status(soup):
+    """Ищет статус PEP в HTML-дереве карточки."""
+    status_tag = soup.find('abbr', attrs={'title': True})
+    return status_tag.text.strip() if status_tag else None
+
+
+def extract_pep_status(html, encoding=None):
+    """Извлекает статус из HTML-кода карточки PEP.
+
+    Статус — текст первого тега <abbr> с атрибутом title. Сначала он
+    ищется регулярными выражениями без построения дерева: комментарии
+    пропускаются, а > в кавычках значений атрибутов не закрывает тег.
+    Если такого тега нет или в нём есть вложенная разметка, страница
+    разбирается целиком. html — HTML-код карточки строкой или в байтах
+    в кодировке encoding (по умолчанию — из <meta charset>, иначе UTF-8);
+    байты ищутся без декодирования страницы, декодируется только
+    найденный статус.
+    """
+    if isinstance(html, str):
+        html, encoding = html.encode('utf-8'), 'utf-8'
+    encoding = encoding or sniff_encoding(html)
+    for match in ABBR_OPEN_PATTERN.finditer(html):
+        attributes = match.group(1)
+        if attributes is None or not TITLE_ATTRIBUTE_PATTERN.search(
+            QUOTED_VALUE_PATTERN.sub(b'""', attributes)
+        ):
+            continue
+        text = ABBR_TEXT_PATTERN.match(html, match.end())
+        if text is None:
+            break
+        return unescape(
+            text.group(1).decode(encoding, errors='replace')
+        ).strip()
+    return find_pep_status(parse_html(html, encoding))
+
+
 def get_pep_status(session, pep_url):
     """Получает статус PEP-документа."""
-    soup = get_soup(session, pep_url)
-    status_tag = soup.find('abbr', title=True)
-    return status_tag.text.strip() if status_tag else None
+    response = get_response(session, pep_url)
+    return extract_pep_status(response.content, response.encoding)
+
+
+def stream_pep_status(session, pep_url):
+    """Потоково загружает карточку PEP до первого <abbr> с атрибутом title.
+
+    Возвращает то же, что get_pep_status. Карточка из HTTP-кеша
+    разбирается целиком без загрузки.
+    """
+    html = get_cached_content(session, pep_url)
+    if html is not None:
+        return extract_pep_status(html)
+    with profiler.stage('fetch'), closing(
+        iter_page_elements(session, pep_url, ('abbr',))
+    ) as elements:
+        for element in elements:
+            if 'title' in element.attrib:
+                return element_text(element).strip()
+    return None
 
 
 def parse_pep_list(session):
-    """Получает список всех PEP-документов и их ссылки."""
-    soup = get_soup(session, PEP_DOC_URL)
-    section = find_tag(soup, 'section', attrs={'id': 'index-by-category'})
-    table_rows = section.find_all('tr')[1:]
-
-    pep_links = []
-    for row in table_rows:
-        columns = row.find_all('td')
-        if not columns:
-            continue
+    """Получает список всех PEP-документов из индекса (PepRecord)."""
+    response = get_response(session, PEP_DOC_URL)
+    with profiler.stage('parse'):
+        return extract_pep_records(
+            response.content, encoding=response.encoding
+        )
 
-        pep_number = columns[1].text.strip()
-        if pep_number == '0':
-            continue
 
-        abbr_tag_elem = columns[0].find('abbr')
-        abbr_text = abbr_tag_elem.text.strip() if abbr_tag_elem else ''
-        second_letter = abbr_text[1] if len(abbr_text) > 1 else ''
-        pep_link = urljoin(PEP_DOC_URL, columns[1].find('a')['href'])
+def extract_pep_records(html, base_url=PEP_DOC_URL, encoding=None):
+    """Извлекает записи PepRecord из индекса PEP за один проход.
 
-        pep_links.append((second_letter, pep_number, pep_link))
+    Страница разбирается потоково через lxml.etree.iterparse: строки
+    таблиц раздела index-by-category обрабатываются по мере разбора и сразу
+    удаляются из дерева, а после конца раздела разбор прекращается.
+    Поиск не зависит от --parser. Байты декодируются в кодировке encoding
+    (по умолчанию — из <meta charset>, иначе UTF-8).
+    """
+    from io import BytesIO
 
-    return pep_links
+    from lxml import etree
 
+    if isinstance(html, str):
+        html, encoding = html.encode('utf-8'), 'utf-8'
+    index_section = None
+    records = []
+    for event, element in etree.iterparse(
+        BytesIO(html), events=('start', 'end'), tag=('section', 'tr'),
+        html=True, encoding=encoding or sniff_encoding(html),
+    ):
+        if element.tag == 'section':
+            if event == 'end' and element is index_section:
+                break
+            if event == 'start' and index_section is None and (
+                element.get('id') == PEP_INDEX_SECTION_ID
+            ):
+                index_section = element
+        elif event == 'end' and index_section is not None:
+            record = make_pep_record(element, base_url)
+            if record is not None:
+                records.append(record)
+            drop_element(element)
+    if index_section is None:
+        raise ParserFindTagException(
+            f"Не найден тег section {{'id': '{PEP_INDEX_SECTION_ID}'}}"
+        )
+    return records
+
+
+def make_pep_record(row, base_url):
+    """Возвращает PepRecord для строки таблицы индекса или None.
+
+    None возвращается для строк без номера со ссылкой на карточку и для
+    PEP 0 (сам индекс).
+    """
+    cells = row.findall('td')
+    if len(cells) < 2:
+        return None
+    number = ''.join(cells[1].itertext()).strip()
+    link = cells[1].find('.//a[@href]')
+    if number == '0' or link is None:
+        return None
+    abbr = cells[0].find('.//abbr')
+    letters = ''.join(abbr.itertext()).strip() if abbr is not None else ''
+    return PepRecord(
+        number,
+        urljoin(base_url, link.get('href')),
+        letters[:1],
+        letters[1:2],
+    )
+
+
+def drop_element(element):
+    """Очищает разобранный элемент и удаляет предыдущие из дерева."""
+    element.clear(keep_tail=True)
+    parent = element.getparent()
+    while element.getprevious() is not None:
+        del parent[0]
+
+
+def get_pep_statuses(
+    session,
+    pep_links,
+    workers=DEFAULT_WORKERS,
+    engine=ENGINE_THREADS,
+    known_statuses=None,
+    parse_workers=DEFAULT_PARSE_WORKERS,
+    stream_parse=False,
+):
+    """Отдаёт (pep_link, status, error) для каждого PEP в порядке списка.
+
+    Статусы PEP, чья строка индекса есть в known_statuses, берутся оттуда
+    без загрузки карточки. С stream_parse=True загрузка карточки
+    обрывается, как только найден статус.
+    """
+    known_statuses = known_statuses or {}
+    missing_links = [
+        pep_link for pep_link in pep_links if pep_link not in known_statuses
+    ]
+    fetch, extract = get_content, extract_pep_status
+    if stream_parse:
+        fetch, extract = stream_pep_status, None
+    pages = crawl(
+        session, [pep_link.url for pep_link in missing_links],
+        fetch, extract,
+        workers=workers, errors=(RequestError, RuntimeError), engine=engine,
+        parse_workers=parse_workers
+    )
+    for pep_link in pep_links:
+        if pep_link in known_statuses:
+            yield pep_link, known_statuses[pep_link], None
+        else:
+            _, status, error = next(pages)
+            yield pep_link, status, error
+
+
+def process_pep_data(
+    session,
+    pep_links,
+    workers=DEFAULT_WORKERS,
+    engine=ENGINE_THREADS,
+    state=None,
+    checkpoint=None,
+    parse_workers=DEFAULT_PARSE_WORKERS,
+    pep_rows=None,
+    stream_parse=False,
+):
+    """Обрабатывает список PEP и считает их статусы, сверяя с ожидаемыми.
+
+    В список pep_rows, если он передан, добавляются строки по каждому PEP:
+    (номер, ссылка, ожидаемые статусы, статус в карточке, несовпадение).
+
+    Если передано сохранённое состояние state, карточки загружаются только
+    для новых PEP и PEP с изменившейся строкой индекса. Статусы из
+    контрольной точки checkpoint не загружаются повторно, а новые статусы
+    записываются в неё; после обхода без ошибок она удаляется.
+    stream_parse включает потоковый разбор карточек (get_pep_statuses).
+    """
+    from tqdm import tqdm
 
-def process_pep_data(session, pep_links):
-    """Обрабатывает список PEP и считает их статусы, сверяя с ожидаемыми."""
     status_counts = Counter()
     mismatched_peps = []
     errors = []
+    saved_statuses = state.load() if state else {}
+    known_statuses = {
+        **saved_statuses, **(checkpoint.done if checkpoint else {})
+    }
+    parsed_statuses = {}
 
-    for second_letter, pep_number, pep_url in tqdm(
-        pep_links,
+    statuses = get_pep_statuses(
+        session, pep_links, workers, engine, known_statuses, parse_workers,
+        stream_parse
+    )
+    for pep_link, actual_status, error in tqdm(
+        profiler.timed('pep.item', statuses),
+        total=len(pep_links),
         desc="Парсинг PEP"
     ):
-        expected_statuses = EXPECTED_STATUS.get(second_letter, ("Unknown",))
+        expected_statuses = EXPECTED_STATUS.get(
+            pep_link.status_letter, ("Unknown",)
+        )
 
-        try:
-            actual_status = get_pep_status(session, pep_url)
-        except RuntimeError as error:
+        if error is not None:
             errors.append(str(error))
             continue
+        parsed_statuses[pep_link] = actual_status
+        if checkpoint and pep_link not in checkpoint.done:
+            checkpoint.add(pep_link, actual_status)
+        if pep_rows is not None:
+            pep_rows.append(make_pep_row(
+                pep_link, expected_statuses, actual_status
+            ))
 
         if actual_status:
             status_counts[actual_status] += 1
             if actual_status not in expected_statuses:
                 mismatched_peps.append((
-                    pep_url,
+                    pep_link.url,
                     actual_status,
                     expected_statuses
                 ))
 
+    if state:
+        state.save(parsed_statuses)
+        reused = sum(pep_link in saved_statuses for pep_link in pep_links)
+        logger.info(
+            "Статусы PEP из сохранённого состояния: %s из %s",
+            reused,
+            len(pep_links)
+        )
+
+    if checkpoint and not errors:
+        checkpoint.remove()
+
+    log_pep_problems(errors, mismatched_peps)
+    status_counts["Total"] = sum(status_counts.values())
+    return status_counts
+
+
+def make_pep_row(pep_link, expected_statuses, actual_status):
+    """Возвращает строку результата по одному PEP."""
+    return (
+        int(pep_link.number),
+        pep_link.url,
+        ', '.join(expected_statuses),
+        actual_status,
+        actual_status not in expected_statuses,
+    )
+
+
+def log_pep_problems(errors, mismatched_peps):
+    """Выводит в лог ошибки загрузки и несовпадения статусов PEP."""
     if errors:
         logger.error(
             "Ошибки при парсинге PEP-документов:\n%s", "\n".join(errors))
@@ -129,6 +641,3 @@ def process_pep_data(session, pep_links):
                 f"Статус в карточке: {actual_status}\n"
                 f"Ожидаемые статусы: {list(expected_statuses)}\n"
             )
-
-    status_counts["Total"] = sum(status_counts.values())
-    return status_counts
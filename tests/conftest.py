@@ -17,6 +17,8 @@ sys.path.append(str(SRC_DIR))
 MAIN_DOC_URL = 'https://docs.python.org/3/'
 PEP_URL = 'https://www.python.org/dev/peps/'
 
+from bench.common import PAGES_DIR, get_pages_adapter, saved_pages  # noqa: E402
+
 
 precode_files = ['constants.py', 'main.py', 'utils.py']
 src_dir_files = [file.name for file in SRC_DIR.rglob('*.py')]
@@ -31,6 +33,18 @@ def pytest_make_parametrize_id(config, val):
     return repr(val)
 
 
+@pytest.fixture(params=['bs4', 'lxml', 'selectolax'])
+def parser_backend(request):
+    """Выбирает библиотеку разбора HTML на время теста."""
+    import parsers
+
+    pytest.importorskip(parsers.PARSER_PACKAGES[request.param])
+    previous = parsers.get_parser()
+    parsers.set_parser(request.param)
+    yield parsers
+    parsers.set_parser(previous)
+
+
 @pytest.fixture(scope='function')
 def tempfile_session() -> CachedSession:
     """Get a CachedSession using a temporary SQLite db"""
@@ -72,10 +86,48 @@ def mock_session(tempfile_session) -> CachedSession:
     yield mount_mock_adapter(tempfile_session)
 
 
+@pytest.fixture(scope='session')
+def snapshot_path(tmp_path_factory):
+    """Snapshot archive with the saved pages, as `main.py snapshot` writes."""
+    from snapshots import SnapshotArchive
+
+    path = tmp_path_factory.mktemp('snapshots') / 'snapshot.sqlite3'
+    with SnapshotArchive(path) as archive:
+        for url, headers, body in saved_pages():
+            archive.add(url, 200, headers, body)
+    return path
+
+
+@pytest.fixture(scope='function')
+def replay_session(tempfile_session, snapshot_path) -> CachedSession:
+    """Session replaying the snapshot archive without network access."""
+    from snapshots import ReplayAdapter, SnapshotArchive
+
+    adapter = ReplayAdapter(SnapshotArchive(snapshot_path, readonly=True))
+    tempfile_session.mount('http://', adapter)
+    tempfile_session.mount('https://', adapter)
+    yield tempfile_session
+    tempfile_session.close()
+
+
+@pytest.fixture(autouse=True)
+def checkpoints_dir(monkeypatch, tmp_path):
+    """Keep crawl checkpoints out of src/ during tests."""
+    checkpoints_dir = tmp_path / 'checkpoints'
+    monkeypatch.setattr(main, 'CHECKPOINTS_DIR', checkpoints_dir)
+    return checkpoints_dir
+
+
+@pytest.fixture(scope='function')
+def pages_session(tempfile_session) -> CachedSession:
+    tempfile_session.mount('https://', get_pages_adapter())
+    yield tempfile_session
+
+
 @pytest.fixture
-def response_page(mock_session):
+def response_page(replay_session):
     def _response_page(page):
-        response = mock_session.get(page)
+        response = replay_session.get(page)
         response.encoding = 'utf-8'
         return response.text
     return _response_page
@@ -83,7 +135,7 @@ def response_page(mock_session):
 
 @pytest.fixture
 def soup(response_page):
-    response = response_page(MAIN_DOC_URL + '/whatsnew')
+    response = response_page(MAIN_DOC_URL + 'whatsnew/')
     return BeautifulSoup(response, features='lxml')
 
 
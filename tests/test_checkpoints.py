@@ -0,0 +1,36 @@
+try:
+    from src import checkpoints
+except ModuleNotFoundError:
+    assert False, 'Убедитесь что в директории `src` есть файл `checkpoints.py`'
+except ImportError:
+    assert False, 'Убедитесь что в директории `src` есть файл `checkpoints.py`'
+
+
+def test_checkpoint_resume(tmp_path):
+    path = tmp_path / 'checkpoints' / 'pep.jsonl'
+    pep_link = ('A', '1', 'https://peps.python.org/pep-0001/')
+    with checkpoints.Checkpoint(path) as checkpoint:
+        checkpoint.add(pep_link, 'Active')
+        checkpoint.add('https://docs.python.org/3/', ['Заголовок', 'Автор'])
+    with open(path, 'a', encoding='utf-8') as f:
+        f.write('[["F", "8", "https://peps.python.org/pep-')
+    with checkpoints.Checkpoint(path, resume=True) as checkpoint:
+        assert checkpoint.done == {
+            pep_link: 'Active',
+            'https://docs.python.org/3/': ['Заголовок', 'Автор'],
+        }, 'Оборванная при сбое строка журнала должна пропускаться'
+        checkpoint.add('https://docs.python.org/3/whatsnew/', ['x', 'y'])
+    with checkpoints.Checkpoint(path, resume=True) as checkpoint:
+        assert len(checkpoint.done) == 3
+
+
+def test_checkpoint_without_resume(tmp_path):
+    path = tmp_path / 'pep.jsonl'
+    with checkpoints.Checkpoint(path) as checkpoint:
+        checkpoint.add('url', 'Final')
+    with checkpoints.Checkpoint(path) as checkpoint:
+        assert checkpoint.done == {}, (
+            'Без resume обход должен начинаться заново'
+        )
+        checkpoint.remove()
+    assert not path.exists()
@@ -0,0 +1,82 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+try:
+    from src import coalescing
+except ModuleNotFoundError:
+    assert False, 'Убедитесь что в директории `src` есть файл `coalescing.py`'
+except ImportError:
+    assert False, 'Убедитесь что в директории `src` есть файл `coalescing.py`'
+
+
+def test_coalescer_remembers_responses():
+    coalescer = coalescing.RequestCoalescer(max_entries=2)
+    calls = []
+
+    def fetch(key):
+        return lambda: calls.append(key) or f'ответ {key}'
+
+    assert coalescer.get('a', fetch('a')) == 'ответ a'
+    assert coalescer.get('a', fetch('a')) == 'ответ a'
+    assert coalescer.get('a', fetch('a')) == 'ответ a'
+    assert calls == ['a', 'a'], (
+        'Ответ должен запоминаться со второго запроса ссылки'
+    )
+    coalescer.get('b', fetch('b'))
+    coalescer.get('b', fetch('b'))
+    coalescer.get('a', fetch('a'))
+    coalescer.get('c', fetch('c'))
+    coalescer.get('c', fetch('c'))
+    coalescer.get('a', fetch('a'))
+    coalescer.get('b', fetch('b'))
+    assert calls == ['a', 'a', 'b', 'b', 'c', 'c', 'b'], (
+        'Вытесняться должен давно не использованный ответ'
+    )
+    assert (coalescer.hits, coalescer.duplicates) == (3, 3)
+
+
+def test_coalescer_skips_single_requests():
+    coalescer = coalescing.RequestCoalescer()
+    for key in 'abc':
+        coalescer.get(key, lambda: 'ответ')
+    assert not coalescer._responses, (
+        'Ответы на ссылки, запрошенные один раз, не должны держаться в памяти'
+    )
+
+
+def test_coalescer_joins_in_flight_requests():
+    coalescer = coalescing.RequestCoalescer()
+    started = threading.Event()
+    release = threading.Event()
+    calls = []
+
+    def fetch():
+        calls.append(1)
+        started.set()
+        release.wait(5)
+        return 'ответ'
+
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        first = executor.submit(coalescer.get, 'a', fetch)
+        started.wait(5)
+        others = [executor.submit(coalescer.get, 'a', fetch) for _ in range(3)]
+        while coalescer.coalesced < 3:
+            threading.Event().wait(0.01)
+        release.set()
+        results = [future.result() for future in [first, *others]]
+    assert results == ['ответ'] * 4
+    assert calls == [1], 'Одновременные запросы должны объединяться'
+    assert coalescer.duplicates == 3
+
+
+def test_coalescer_does_not_remember_errors():
+    coalescer = coalescing.RequestCoalescer()
+
+    def fail():
+        raise RuntimeError('Сбой загрузки')
+
+    with pytest.raises(RuntimeError):
+        coalescer.get('a', fail)
+    assert coalescer.get('a', lambda: 'ответ') == 'ответ'
+    assert coalescer.duplicates == 0
@@ -0,0 +1,70 @@
+import pickle
+
+import pytest
+import requests_mock
+from requests_cache import CachedSession, SQLiteCache
+from requests_cache.serializers import pickle_serializer
+try:
+    from src import compression
+except ModuleNotFoundError:
+    assert False, 'Убедитесь что в директории `src` есть файл `compression.py`'
+except ImportError:
+    assert False, 'Убедитесь что в директории `src` есть файл `compression.py`'
+from conftest import PAGES_DIR
+
+PAGE_URL = 'https://peps.python.org/pep-0008/'
+
+
+def create_cached_session(tmp_path, serializer):
+    session = CachedSession(
+        backend=SQLiteCache(tmp_path / 'http_cache', serializer=serializer)
+    )
+    adapter = requests_mock.Adapter()
+    adapter.register_uri(
+        'GET', PAGE_URL,
+        headers={'Content-Type': 'text/html; charset=utf-8'},
+        content=(PAGES_DIR / 'peps.python.org/pep-0008/index.html')
+        .read_bytes(),
+    )
+    session.mount('https://', adapter)
+    return session
+
+
+@pytest.mark.parametrize('codec', ['zlib', 'zstd'])
+def test_compressed_cache(tmp_path, codec):
+    if codec == 'zstd':
+        pytest.importorskip('zstandard')
+    session = create_cached_session(
+        tmp_path, compression.create_serializer(codec)
+    )
+    text = session.get(PAGE_URL).text
+    response = session.get(PAGE_URL)
+    assert response.from_cache is True
+    assert response.text == text
+    with session.cache.responses.connection() as connection:
+        stored, = connection.execute('SELECT value FROM responses').fetchone()
+    assert len(stored) * 3 < len(pickle_serializer.dumps(response)), (
+        'Ответы должны храниться в кеше в сжатом виде'
+    )
+
+
+def test_compressed_cache_after_plain_entries(tmp_path):
+    session = create_cached_session(tmp_path, pickle_serializer)
+    text = session.get(PAGE_URL).text
+    session = create_cached_session(
+        tmp_path, compression.create_serializer('zlib')
+    )
+    assert session.get(PAGE_URL).text == text, (
+        'Включение сжатия не должно ломать существующий кеш'
+    )
+    assert session.get(PAGE_URL).from_cache is True
+
+
+def test_compression_level():
+    serializer = compression.create_serializer('zlib', 1)
+    data = pickle.dumps('<p>PEP</p>' * 1000)
+    assert serializer.stages[-1].loads(serializer.stages[-1].dumps(data)) == (
+        data
+    )
+    with pytest.raises(ValueError):
+        compression.create_serializer('zlib', 10)
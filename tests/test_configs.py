@@ -64,3 +64,153 @@ def test_configure_argument_parser(
     assert got_action.help == help_str, (
         f'Укажите help-строку cli аргумента {got_action.dest}'
     )
+
+
+def test_configure_argument_parser_workers():
+    parser = configs.configure_argument_parser(['pep'])
+    assert parser.parse_args(['pep']).workers == 1
+    assert parser.parse_args(['pep', '--workers', '8']).workers == 8
+    with pytest.raises(SystemExit):
+        parser.parse_args(['pep', '-w', '0'])
+
+
+def test_configure_argument_parser_parse_workers():
+    parser = configs.configure_argument_parser(['pep'])
+    assert parser.parse_args(['pep']).parse_workers == 1
+    args = parser.parse_args(['pep', '--parse-workers', '4'])
+    assert args.parse_workers == 4
+    with pytest.raises(SystemExit):
+        parser.parse_args(['pep', '--parse-workers', '0'])
+
+
+def test_configure_argument_parser_engine():
+    parser = configs.configure_argument_parser(['pep'])
+    assert parser.parse_args(['pep']).engine == 'threads'
+    assert parser.parse_args(['pep', '--engine', 'async']).engine == 'async'
+
+
+def test_configure_argument_parser_revalidate():
+    parser = configs.configure_argument_parser(['pep'])
+    assert parser.parse_args(['pep']).revalidate is False
+    assert parser.parse_args(['pep', '--revalidate']).revalidate is True
+
+
+def test_configure_argument_parser_incremental():
+    parser = configs.configure_argument_parser(['pep'])
+    assert parser.parse_args(['pep']).incremental is False
+    assert parser.parse_args(['pep', '-i']).incremental is True
+
+
+def test_configure_argument_parser_resume():
+    parser = configs.configure_argument_parser(['pep'])
+    assert parser.parse_args(['pep']).resume is False
+    assert parser.parse_args(['pep', '--resume']).resume is True
+
+
+def test_configure_argument_parser_several_modes():
+    parser = configs.configure_argument_parser(['whats-new', 'pep', 'all'])
+    assert parser.parse_args(['pep']).mode == ['pep']
+    assert parser.parse_args(['whats-new', 'pep', '-o', 'file']).mode == [
+        'whats-new', 'pep'
+    ]
+    assert parser.parse_args(['all']).mode == ['all']
+    with pytest.raises(SystemExit):
+        parser.parse_args(['pep', 'download'])
+
+
+def test_configure_argument_parser_parser():
+    parser = configs.configure_argument_parser(['pep'])
+    assert parser.parse_args(['pep']).parser == 'bs4'
+    for name in ('lxml', 'selectolax'):
+        assert parser.parse_args(['pep', '--parser', name]).parser == name
+    with pytest.raises(SystemExit):
+        parser.parse_args(['pep', '--parser', 'html5lib'])
+
+
+def test_configure_argument_parser_stream_parse():
+    parser = configs.configure_argument_parser(['pep'])
+    assert parser.parse_args(['pep']).stream_parse is False
+    assert parser.parse_args(['pep', '--stream-parse']).stream_parse is True
+
+
+def test_configure_argument_parser_per_pep():
+    parser = configs.configure_argument_parser(['pep'])
+    assert parser.parse_args(['pep']).per_pep is False
+    assert parser.parse_args(['pep', '--per-pep']).per_pep is True
+
+
+def test_configure_argument_parser_file_format():
+    parser = configs.configure_argument_parser(['pep'])
+    assert parser.parse_args(['pep']).file_format == 'csv'
+    for file_format in ('jsonl', 'parquet', 'arrow'):
+        assert parser.parse_args(
+            ['pep', '-o', 'file', '-f', file_format]
+        ).file_format == file_format
+    with pytest.raises(SystemExit):
+        parser.parse_args(['pep', '-f', 'xlsx'])
+
+
+def test_configure_argument_parser_profile():
+    parser = configs.configure_argument_parser(['pep'])
+    args = parser.parse_args(['pep'])
+    assert (args.profile, args.profile_json) == (False, None)
+    args = parser.parse_args(['pep', '--profile', '--profile-json', 'p.json'])
+    assert (args.profile, args.profile_json) == (True, 'p.json')
+
+
+def test_configure_argument_parser_http_options():
+    parser = configs.configure_argument_parser(['pep'])
+    args = parser.parse_args(['pep'])
+    assert (args.pool_size, args.retries, args.timeout) == (10, 3, 30)
+    args = parser.parse_args(
+        ['pep', '--pool-size', '4', '--retries', '0', '--timeout', '1.5']
+    )
+    assert (args.pool_size, args.retries, args.timeout) == (4, 0, 1.5)
+    for option, value in (('--retries', '-1'), ('--timeout', '0')):
+        with pytest.raises(SystemExit):
+            parser.parse_args(['pep', option, value])
+
+
+def test_configure_argument_parser_rate_limit():
+    parser = configs.configure_argument_parser(['pep'])
+    assert parser.parse_args(['pep']).rate_limit is None
+    args = parser.parse_args([
+        'pep', '--rate-limit', 'peps.python.org=2.5',
+        '--rate-limit', '1:4',
+    ])
+    assert args.rate_limit == [('peps.python.org', 2.5, 3), (None, 1.0, 4)]
+    for value in ('0', 'host=', 'host=x', '2:0'):
+        with pytest.raises(SystemExit):
+            parser.parse_args(['pep', '--rate-limit', value])
+
+
+def test_configure_argument_parser_cache_options():
+    parser = configs.configure_argument_parser(['pep'])
+    args = parser.parse_args(['pep'])
+    assert (args.cache_backend, args.cache_ttl, args.cache_max_entries) == (
+        'sqlite', None, None
+    )
+    args = parser.parse_args([
+        'pep', '--cache-backend', 'filesystem', '--cache-ttl', '3600',
+        '--cache-max-entries', '100',
+    ])
+    assert (args.cache_backend, args.cache_ttl, args.cache_max_entries) == (
+        'filesystem', 3600, 100
+    )
+    with pytest.raises(SystemExit):
+        parser.parse_args(['pep', '--cache-backend', 'mongodb'])
+
+
+def test_configure_argument_parser_cache_compression():
+    parser = configs.configure_argument_parser(['pep'])
+    args = parser.parse_args(['pep'])
+    assert (args.cache_compression, args.cache_compression_level) == (
+        'zlib', None
+    )
+    args = parser.parse_args([
+        'pep', '--cache-compression', 'zstd',
+        '--cache-compression-level', '19',
+    ])
+    assert (args.cache_compression, args.cache_compression_level) == (
+        'zstd', 19
+    )
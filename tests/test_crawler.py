@@ -0,0 +1,299 @@
+import threading
+import time
+from functools import partial
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+from types import SimpleNamespace
+
+import pytest
+import requests
+
+from conftest import PAGES_DIR
+try:
+    from src import crawler, memo, sessions, utils
+except ModuleNotFoundError:
+    assert False, 'Убедитесь что в директории `src` есть файл `crawler.py`'
+except ImportError:
+    assert False, 'Убедитесь что в директории `src` есть файл `crawler.py`'
+
+
+class SlowHandler(SimpleHTTPRequestHandler):
+    """Отдаёт сохранённые страницы и считает одновременные запросы."""
+
+    lock = threading.Lock()
+    active = 0
+    max_active = 0
+
+    def do_GET(self):
+        with self.lock:
+            type(self).active += 1
+            type(self).max_active = max(self.max_active, self.active)
+        time.sleep(0.02)
+        try:
+            super().do_GET()
+        finally:
+            with self.lock:
+                type(self).active -= 1
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def pages_server():
+    handler = partial(
+        SlowHandler, directory=str(PAGES_DIR / 'peps.python.org')
+    )
+    server = ThreadingHTTPServer(('127.0.0.1', 0), handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    SlowHandler.max_active = 0
+    yield f'http://127.0.0.1:{server.server_address[1]}/'
+    server.shutdown()
+    server.server_close()
+
+
+def pep_urls(base_url):
+    numbers = (1, 8, 20, 257, 484, 3099, 563, 689, 736, 554, 3150, 211, 401)
+    return [f'{base_url}pep-{number:04d}/' for number in numbers]
+
+
+def test_crawl_keeps_order(pages_server):
+    urls = pep_urls(pages_server)
+    session = requests.Session()
+    sequential = list(crawler.crawl(
+        session, urls, utils.get_page, utils.extract_pep_status
+    ))
+    threaded = list(crawler.crawl(
+        session, urls, utils.get_page, utils.extract_pep_status, workers=4
+    ))
+    assert [url for url, _, _ in sequential] == urls
+    assert threaded == sequential
+    assert sequential[-1][1] == 'April Fool!'
+
+
+def test_crawl_async_engine(pages_server):
+    pytest.importorskip('aiohttp')
+    urls = pep_urls(pages_server)
+    session = requests.Session()
+    expected = list(crawler.crawl(
+        session, urls, utils.get_page, utils.extract_pep_status
+    ))
+    got = list(crawler.crawl(
+        session, urls, utils.get_page, utils.extract_pep_status,
+        workers=3, engine='async'
+    ))
+    assert got == expected, (
+        'Асинхронный движок должен давать тот же результат, что и потоковый'
+    )
+    assert SlowHandler.max_active <= 3, (
+        'Асинхронный движок не должен превышать заданное число запросов'
+    )
+
+
+def test_crawl_async_engine_errors(pages_server):
+    pytest.importorskip('aiohttp')
+    urls = [pages_server + 'pep-9999/', pages_server + 'pep-0008/']
+    got = list(crawler.crawl(
+        requests.Session(), urls, utils.get_page, utils.extract_pep_status,
+        errors=(utils.RequestError,), engine='async'
+    ))
+    assert got[0][1] is None
+    assert isinstance(got[0][2], utils.RequestError)
+    assert got[1] == (urls[1], 'Active', None)
+
+
+def test_crawl_async_engine_uses_cache(pages_session):
+    pytest.importorskip('aiohttp')
+    url = 'https://peps.python.org/pep-0008/'
+    pages_session.get(url)
+    got = list(crawler.crawl(
+        pages_session, [url], utils.get_page, utils.extract_pep_status,
+        engine='async'
+    ))
+    assert got == [(url, 'Active', None)]
+
+
+def test_crawl_async_engine_saves_cache(pages_server):
+    pytest.importorskip('aiohttp')
+    urls = pep_urls(pages_server)[:3]
+    session = sessions.ParserSession(backend='memory')
+    got = list(crawler.crawl(
+        session, [*urls, urls[0]], utils.get_page, utils.extract_pep_status,
+        engine='async'
+    ))
+    assert [status for _, status, _ in got] == [
+        'Active', 'Active', 'Active', 'Active'
+    ]
+    assert session.cache_stats == {'miss': 3}, (
+        'Повторяющаяся ссылка должна загружаться один раз'
+    )
+    response = session.get(urls[1])
+    assert response.from_cache, (
+        'Ответы асинхронного движка должны сохраняться в HTTP-кеш'
+    )
+    assert utils.extract_pep_status(response.content) == 'Active'
+    list(crawler.crawl(
+        session, urls, utils.get_page, utils.extract_pep_status,
+        engine='async'
+    ))
+    assert session.cache_stats == {'miss': 3, 'hit': 4}
+
+
+class FlakyHandler(SimpleHTTPRequestHandler):
+    """Отвечает 503 с Retry-After на первый запрос каждой страницы."""
+
+    requested = []
+
+    def do_GET(self):
+        self.requested.append(self.path)
+        if self.requested.count(self.path) == 1:
+            self.send_response(503)
+            self.send_header('Retry-After', '0')
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+            return
+        super().do_GET()
+
+    def log_message(self, *args):
+        pass
+
+
+def test_crawl_async_engine_retries():
+    pytest.importorskip('aiohttp')
+    handler = partial(
+        FlakyHandler, directory=str(PAGES_DIR / 'peps.python.org')
+    )
+    server = ThreadingHTTPServer(('127.0.0.1', 0), handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    FlakyHandler.requested = []
+    url = f'http://127.0.0.1:{server.server_address[1]}/pep-0008/'
+    session = requests.Session()
+    try:
+        session.mount('http://', sessions.create_adapter(1, retries=0))
+        got = list(crawler.crawl(
+            session, [url], utils.get_page, utils.extract_pep_status,
+            errors=(utils.RequestError,), engine='async'
+        ))
+        assert 'HTTP 503' in str(got[0][2])
+        session.mount('http://', sessions.create_adapter(1, retries=2))
+        got = list(crawler.crawl(
+            session, [url], utils.get_page, utils.extract_pep_status,
+            engine='async'
+        ))
+    finally:
+        server.shutdown()
+        server.server_close()
+    assert got == [(url, 'Active', None)], (
+        'Асинхронный движок должен повторять запросы по политике адаптера'
+    )
+    assert FlakyHandler.requested == ['/pep-0008/'] * 2
+
+
+def test_get_retry_delay():
+    retry = sessions.create_adapter(1, retries=3).max_retries
+    assert crawler.get_retry_delay(retry, 1) == 2 * retry.backoff_factor
+    assert crawler.get_retry_delay(retry, 1, retry_after='7') == 7
+    legacy_retry = SimpleNamespace(
+        respect_retry_after_header=True, backoff_factor=1, BACKOFF_MAX=3
+    )
+    assert crawler.get_retry_delay(legacy_retry, 5) == 3, (
+        'Предел паузы urllib3 < 2 берётся из Retry.BACKOFF_MAX'
+    )
+
+
+def test_crawl_uses_session_memo(pages_session, tmp_path, monkeypatch):
+    pages_session.memo = memo.ExtractionMemo(tmp_path / 'memo.sqlite3')
+    url = 'https://peps.python.org/pep-0008/'
+    first = list(crawler.crawl(
+        pages_session, [url], utils.get_page, utils.extract_pep_status
+    ))
+
+    def fail(html):
+        raise AssertionError('Страница не должна разбираться повторно')
+    fail.__qualname__ = utils.extract_pep_status.__qualname__
+
+    second = list(crawler.crawl(pages_session, [url], utils.get_page, fail))
+    assert second == first == [(url, 'Active', None)]
+
+
+def test_crawl_parse_workers(pages_session, tmp_path):
+    pep_urls = [
+        f'https://peps.python.org/{page.parent.name}/'
+        for page in sorted(PAGES_DIR.glob('peps.python.org/pep-*/index.html'))
+    ]
+    missing_url = 'https://peps.python.org/pep-9999/'
+    pages_session.get_adapter(missing_url).register_uri(
+        'GET', missing_url, status_code=404
+    )
+    urls = [*pep_urls[:5], missing_url, *pep_urls[5:]]
+    crawl = partial(
+        crawler.crawl, pages_session, urls, utils.get_page,
+        utils.extract_pep_status, errors=(utils.RequestError,)
+    )
+    sequential = list(crawl())
+    pages_session.memo = memo.ExtractionMemo(tmp_path / 'memo.sqlite3')
+    parallel = list(crawl(workers=4, parse_workers=2))
+    assert [url for url, _, _ in parallel] == urls
+    assert [status for _, status, _ in parallel] == (
+        [status for _, status, _ in sequential]
+    ), 'Разбор в процессах должен давать тот же результат'
+    assert isinstance(parallel[5][2], utils.RequestError)
+    assert pages_session.memo.misses == len(pep_urls)
+    assert [status for _, status, _ in crawl(parse_workers=2)] == (
+        [status for _, status, _ in parallel]
+    )
+    assert pages_session.memo.hits == len(pep_urls), (
+        'Результаты разбора в процессах должны попадать в кеш'
+    )
+
+
+class StalledPageHandler(SimpleHTTPRequestHandler):
+    """Отдаёт начало карточки PEP и не завершает ответ до сигнала."""
+
+    release = threading.Event()
+
+    def do_GET(self):
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/html; charset=utf-8')
+        self.send_header('Content-Length', '1000000')
+        self.end_headers()
+        head = (
+            '<html><body><dl><dt>Status</dt><dd>'
+            '<abbr title="Accepted and implementation complete">Final'
+            '</abbr></dd></dl>'
+        ).encode('utf-8')
+        self.wfile.write(head.ljust(2 * utils.STREAM_CHUNK_SIZE))
+        self.wfile.flush()
+        self.release.wait(5)
+
+    def log_message(self, *args):
+        pass
+
+
+def test_stream_parse_stops_download():
+    server = ThreadingHTTPServer(('127.0.0.1', 0), StalledPageHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    StalledPageHandler.release.clear()
+    url = f'http://127.0.0.1:{server.server_address[1]}/pep-0008/'
+    try:
+        started = time.perf_counter()
+        status = utils.stream_pep_status(requests.Session(), url)
+        elapsed = time.perf_counter() - started
+    finally:
+        StalledPageHandler.release.set()
+        server.shutdown()
+        server.server_close()
+    assert status == 'Final'
+    assert elapsed < 2, (
+        'Загрузка должна обрываться, как только статус найден'
+    )
+
+
+def test_crawl_stream_parse_requires_threads(pages_session):
+    with pytest.raises(RuntimeError):
+        list(crawler.crawl(
+            pages_session, ['https://peps.python.org/pep-0008/'],
+            utils.stream_pep_status, None, engine='async'
+        ))
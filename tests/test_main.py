@@ -1,4 +1,5 @@
 import pytest
+from argparse import Namespace
 from pathlib import Path
 try:
     from src import main
@@ -140,3 +141,120 @@ def test_mode_to_function():
             'В модуле `main.py` в объекте `MODE_TO_FUNCTION` '
             f'нет значения {func}'
         )
+
+
+def test_whats_new_pages(pages_session):
+    got = main.whats_new(pages_session)
+    assert len(got) == 9
+    assert got[3] == (
+        'https://docs.python.org/3/whatsnew/3.10.html',
+        'What’s New In Python 3.10¶',
+        ' Release: 3.10.1  Date: December 13, 2021  '
+        'Editor: Pablo Galindo Salgado  ',
+    )
+
+
+def test_latest_versions_pages(pages_session):
+    got = main.latest_versions(pages_session)
+    assert got[0] == ('Ссылка на документацию', 'Версия', 'Статус')
+    assert got[1] == (
+        'https://docs.python.org/3.13/', '3.13', 'in development'
+    )
+    assert got[-1] == (
+        'https://www.python.org/doc/versions/', 'All versions', ''
+    )
+
+
+def test_download_pages(monkeypatch, tmp_path, pages_session):
+    monkeypatch.setattr(main, 'BASE_DIR', Path(tmp_path))
+    assert main.download(pages_session) is None
+    archive = tmp_path / 'downloads' / 'python-3.12.3-docs-pdf-a4.zip'
+    assert archive.read_bytes()[:2] == b'PK'
+
+
+def test_whats_new_rows_stream(pages_session):
+    rows = main.whats_new.rows(pages_session)
+    assert next(rows) == ('Ссылка на статью', 'Заголовок', 'Редактор, автор')
+    assert next(rows)[0] == 'https://docs.python.org/3/whatsnew/3.12.html'
+    assert len(list(rows)) == 7
+
+
+def test_run_mode_streams_rows(pages_session):
+    args = Namespace(
+        workers=1, engine='threads', resume=False, parse_workers=1,
+        stream_parse=False
+    )
+    rows = main.run_mode(pages_session, 'whats-new', args)
+    assert not isinstance(rows, list), (
+        'Потоковый режим должен отдавать строки генератором'
+    )
+    assert list(rows) == main.whats_new(pages_session)
+
+
+def test_whats_new_resume(pages_session, checkpoints_dir):
+    from src.checkpoints import Checkpoint
+    done_url = 'https://docs.python.org/3/whatsnew/3.12.html'
+    path = checkpoints_dir / 'whats-new.jsonl'
+    with Checkpoint(path) as checkpoint:
+        checkpoint.add(done_url, ['Из контрольной точки', 'Автор'])
+    requested = []
+    pages_session.hooks['response'].append(
+        lambda response, *args, **kwargs: requested.append(response.url)
+    )
+    got = main.whats_new(pages_session, resume=True)
+    assert got[1] == (done_url, 'Из контрольной точки', 'Автор')
+    assert done_url not in requested, (
+        'С --resume обработанные статьи не загружаются повторно'
+    )
+    assert len(got) == 9
+    assert not path.exists()
+
+
+def test_resolve_modes():
+    assert main.resolve_modes(['pep', 'all', 'pep']) == [
+        'pep', 'whats-new', 'latest-versions', 'download'
+    ]
+    assert main.resolve_modes(['latest-versions']) == ['latest-versions']
+
+
+def test_run_modes_share_session(monkeypatch, pages_session):
+    outputs = []
+    monkeypatch.setattr(
+        main, 'control_output',
+        lambda results, cli_args: outputs.append(
+            (cli_args.mode, list(results))
+        )
+    )
+    args = Namespace(
+        mode=['whats-new', 'latest-versions'], output=None, workers=1,
+        engine='threads', resume=False, parse_workers=1, stream_parse=False
+    )
+    main.run_modes(pages_session, ['whats-new', 'latest-versions'], args)
+    assert outputs == [
+        ('whats-new', main.whats_new(pages_session)),
+        ('latest-versions', main.latest_versions(pages_session)),
+    ], 'Каждый режим должен выводить свои результаты в порядке режимов'
+    assert args.mode == ['whats-new', 'latest-versions']
+
+
+def test_run_modes_isolates_errors(monkeypatch, pages_session, caplog):
+    def broken(session):
+        raise RuntimeError('Сбой режима')
+
+    monkeypatch.setitem(main.MODE_TO_FUNCTION, 'download', broken)
+    outputs = []
+    monkeypatch.setattr(
+        main, 'control_output',
+        lambda results, cli_args: outputs.append(cli_args.mode)
+    )
+    args = Namespace(output='pretty')
+    main.run_modes(pages_session, ['download', 'latest-versions'], args)
+    assert outputs == ['latest-versions']
+    assert 'Ошибка в режиме download' in caplog.text
+
+
+def test_whats_new_stream_parse(pages_session):
+    streamed = main.whats_new(pages_session, stream_parse=True)
+    assert streamed == main.whats_new(pages_session), (
+        'Потоковый разбор должен давать те же строки, что и обычный'
+    )
@@ -0,0 +1,105 @@
+import sqlite3
+
+try:
+    from src import memo
+except ModuleNotFoundError:
+    assert False, 'Убедитесь что в директории `src` есть файл `memo.py`'
+except ImportError:
+    assert False, 'Убедитесь что в директории `src` есть файл `memo.py`'
+
+PAGE_URL = 'https://peps.python.org/pep-0008/'
+
+
+def counting_extract():
+    """Возвращает функцию извлечения, которая считает свои вызовы."""
+    def extract(html):
+        extract.calls += 1
+        return html.upper(), len(html)
+    extract.calls = 0
+    return extract
+
+
+def test_memo_skips_extraction(tmp_path):
+    extract = counting_extract()
+    extraction_memo = memo.ExtractionMemo(tmp_path / 'memo.sqlite3')
+    first = extraction_memo.extract(PAGE_URL, '<h1>a</h1>', extract)
+    second = extraction_memo.extract(PAGE_URL, '<h1>a</h1>', extract)
+    assert extract.calls == 1, (
+        'Для неизменившейся страницы результат должен браться из кеша'
+    )
+    assert first == second, (
+        'Результат из кеша должен быть кортежем, как у функции извлечения'
+    )
+    extraction_memo.extract(PAGE_URL, '<h1>b</h1>', extract)
+    assert extract.calls == 2, (
+        'Изменившаяся страница должна разбираться заново'
+    )
+    assert (extraction_memo.hits, extraction_memo.misses) == (1, 2)
+
+
+def test_memo_persists_and_evicts(tmp_path):
+    path = tmp_path / 'memo.sqlite3'
+    extract = counting_extract()
+    extraction_memo = memo.ExtractionMemo(path, max_entries=2)
+    for number in range(3):
+        extraction_memo.extract(f'{PAGE_URL}{number}', 'html', extract)
+    extraction_memo.close()
+
+    extraction_memo = memo.ExtractionMemo(path, max_entries=2)
+    extraction_memo.extract(f'{PAGE_URL}2', 'html', extract)
+    extraction_memo.extract(f'{PAGE_URL}0', 'html', extract)
+    assert extract.calls == 4, (
+        'Кеш должен сохраняться на диск и вытеснять старые записи'
+    )
+
+
+def test_memo_commits_in_batches(tmp_path):
+    path = tmp_path / 'memo.sqlite3'
+    extract = counting_extract()
+    extraction_memo = memo.ExtractionMemo(path, commit_interval=2)
+    for number in range(3):
+        extraction_memo.extract(f'{PAGE_URL}{number}', 'html', extract)
+
+    # Соединение обрывается без close(), как при аварийном завершении.
+    extraction_memo._connection.close()
+    reopened = memo.ExtractionMemo(path)
+    for number in range(3):
+        reopened.extract(f'{PAGE_URL}{number}', 'html', extract)
+    assert extract.calls == 4, (
+        'Записи должны сохраняться на диск до закрытия кеша'
+    )
+
+
+def test_memo_key_depends_on_parser(tmp_path, monkeypatch):
+    import parsers
+
+    extract = counting_extract()
+    extraction_memo = memo.ExtractionMemo(tmp_path / 'memo.sqlite3')
+    extraction_memo.extract(PAGE_URL, 'html', extract)
+    monkeypatch.setattr(parsers, '_current_parser', 'lxml')
+    extraction_memo.extract(PAGE_URL, 'html', extract)
+    assert extract.calls == 2, (
+        'Результаты разных библиотек разбора должны храниться отдельно'
+    )
+    extraction_memo.close()
+
+
+def test_memo_drops_old_versions(tmp_path):
+    path = tmp_path / 'memo.sqlite3'
+    extraction_memo = memo.ExtractionMemo(path)
+    extraction_memo.put('0:bs4:extract:url:digest', 'старый результат')
+    extraction_memo.put(
+        memo.ExtractionMemo.make_key(len, PAGE_URL, 'html'), 4
+    )
+    extraction_memo.close()
+    with sqlite3.connect(path) as connection:
+        keys = [row[0] for row in connection.execute('SELECT key FROM memo')]
+    assert len(keys) == 2
+    extraction_memo = memo.ExtractionMemo(path)
+    assert extraction_memo.get('0:bs4:extract:url:digest') is None, (
+        'Записи прежних версий кеша должны удаляться'
+    )
+    assert extraction_memo.get(
+        memo.ExtractionMemo.make_key(len, PAGE_URL, 'html')
+    ) == 4
+    extraction_memo.close()
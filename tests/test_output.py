@@ -90,3 +90,61 @@ def test_output_file():
     assert hasattr(outputs, 'file_output'), (
         'Напишите функцию `file_output` в модуле `output.py`'
     )
+
+
+def test_file_output_streams_rows(monkeypatch, tmp_path):
+    monkeypatch.setattr(outputs, 'BASE_DIR', Path(tmp_path))
+
+    def rows():
+        yield ('Статус', 'Количество')
+        yield ('Active', 1)
+        raise RuntimeError('Сбой посреди обхода')
+
+    with pytest.raises(RuntimeError):
+        outputs.file_output(rows(), cli_args('pep', 'file'))
+    output_file, = (tmp_path / 'results').glob('*.csv')
+    assert output_file.read_text(encoding='utf-8').splitlines() == [
+        '"Статус","Количество"', '"Active","1"'
+    ], 'Полученные до сбоя строки должны оставаться в файле'
+
+
+def test_pretty_output_accepts_generator(capsys):
+    outputs.pretty_output(iter([('Статус', 'Количество'), ('Active', 1)]))
+    captured_out, _ = capsys.readouterr()
+    assert 'Active' in captured_out
+
+
+ROWS = [('Статус', 'Количество'), ('Active', 4), ('Final', 3)]
+
+
+def test_file_output_jsonl(monkeypatch, tmp_path):
+    monkeypatch.setattr(outputs, 'BASE_DIR', Path(tmp_path))
+    args = cli_args('pep', 'file')
+    args.file_format = 'jsonl'
+    outputs.file_output(iter(ROWS), args)
+    output_file, = (tmp_path / 'results').glob('pep_*.jsonl')
+    assert output_file.read_text(encoding='utf-8').splitlines() == [
+        '{"Статус": "Active", "Количество": 4}',
+        '{"Статус": "Final", "Количество": 3}',
+    ]
+
+
+@pytest.mark.parametrize('file_format', ['parquet', 'arrow'])
+def test_file_output_columnar(monkeypatch, tmp_path, file_format):
+    pyarrow = pytest.importorskip('pyarrow')
+    monkeypatch.setattr(outputs, 'BASE_DIR', Path(tmp_path))
+    args = cli_args('pep', 'file')
+    args.file_format = file_format
+    outputs.file_output(iter(ROWS), args)
+    output_file, = (tmp_path / 'results').glob(f'pep_*.{file_format}')
+    if file_format == 'parquet':
+        import pyarrow.parquet as parquet
+        table = parquet.read_table(output_file)
+    else:
+        table = pyarrow.ipc.open_file(output_file).read_all()
+    assert table.column_names == ['Статус', 'Количество']
+    assert table.to_pylist() == [
+        {'Статус': 'Active', 'Количество': 4},
+        {'Статус': 'Final', 'Количество': 3},
+    ]
+    assert table.schema.field('Количество').type == pyarrow.int64()
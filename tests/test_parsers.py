@@ -0,0 +1,64 @@
+import re
+
+import pytest
+try:
+    from src import main
+except ModuleNotFoundError:
+    assert False, 'Убедитесь что в директории `src` есть файл `parsers.py`'
+except ImportError:
+    assert False, 'Убедитесь что в директории `src` есть файл `parsers.py`'
+
+HTML = (
+    '<div class="a b"><div class="a" id="inner">'
+    '<a href="/docs/python-pdf-a4.zip" title>PDF &amp; A4</a>'
+    '<a href="/docs/python-html.zip">HTML</a>'
+    '</div></div><p>Ещё</p>'
+).encode('utf-8')
+
+
+def test_parse_html_find(parser_backend):
+    root = parser_backend.parse_html(HTML)
+    outer = root.find('div', attrs={'class': 'a'})
+    assert outer.get('id') is None
+    inner = outer.find('div', attrs={'class': 'a'})
+    assert inner['id'] == 'inner', 'Поиск должен идти только по потомкам'
+    assert inner.find('div') is None
+    assert [tag.text for tag in root.find_all('a')] == ['PDF & A4', 'HTML']
+    assert root.find('a', attrs={'title': True}).text == 'PDF & A4'
+    assert root.find(
+        'a', attrs={'href': re.compile(r'.+html\.zip$')}
+    )['href'] == '/docs/python-html.zip'
+    assert root.find('a', attrs={'href': re.compile('epub')}) is None
+    assert root.find('p').text == 'Ещё'
+    assert root.find('table') is None
+
+
+@pytest.mark.parametrize('mode', list(main.MODE_TO_FUNCTION))
+def test_modes_under_parser(
+    mode, parser_backend, pages_session, monkeypatch, tmp_path
+):
+    monkeypatch.setattr(main, 'BASE_DIR', tmp_path)
+    monkeypatch.setattr(main, 'save_to_csv', lambda *args, **kwargs: None)
+    mode_function = main.MODE_TO_FUNCTION[mode]
+    got = mode_function(pages_session)
+    parser_backend.set_parser('bs4')
+    assert got == mode_function(pages_session), (
+        f'Режим {mode} должен давать те же результаты, что и с bs4'
+    )
+
+
+def test_set_parser_requires_package(monkeypatch):
+    import parsers
+
+    monkeypatch.setattr(parsers, 'find_spec', lambda name: None)
+    with pytest.raises(RuntimeError):
+        parsers.set_parser('selectolax')
+    assert parsers.get_parser() == 'bs4'
+
+
+def test_parse_workers_use_parser(parser_backend, pages_session):
+    got = main.whats_new(pages_session, parse_workers=2)
+    parser_backend.set_parser('bs4')
+    assert got == main.whats_new(pages_session), (
+        'Разбор в процессах должен давать те же результаты с любым парсером'
+    )
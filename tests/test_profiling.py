@@ -0,0 +1,53 @@
+import json
+
+try:
+    from src import profiling, utils
+except ModuleNotFoundError:
+    assert False, 'Убедитесь что в директории `src` есть файл `profiling.py`'
+except ImportError:
+    assert False, 'Убедитесь что в директории `src` есть файл `profiling.py`'
+
+
+def test_profiler_disabled():
+    profiler = profiling.Profiler()
+    assert profiler.stage('fetch') is profiling.NULL_CONTEXT
+    items = [1, 2]
+    assert profiler.timed('item', items) is items
+    profiler.count('bytes', 10)
+    assert profiler.summary() == {'stages': {}, 'counters': {}}
+
+
+def test_profiler_summary(tmp_path):
+    profiler = profiling.Profiler()
+    profiler.enable()
+    for duration in range(1, 101):
+        profiler.record('fetch', duration / 1000)
+    assert list(profiler.timed('item', 'ab')) == ['a', 'b']
+    profiler.count('bytes', 10)
+    profiler.count('bytes', 5)
+    summary = profiler.summary()
+    fetch = summary['stages']['fetch']
+    assert fetch['count'] == 100
+    assert round(fetch['p50_ms']) == 50
+    assert round(fetch['p95_ms']) == 95
+    assert round(fetch['max_ms']) == 100
+    assert summary['stages']['item']['count'] == 2
+    assert summary['counters'] == {'bytes': 15}
+
+    path = tmp_path / 'profile.json'
+    profiler.dump_json(path)
+    assert json.loads(path.read_text(encoding='utf-8')) == summary
+
+
+def test_profiler_stages_in_pep_run(monkeypatch, pages_session, capsys):
+    profiler = profiling.Profiler()
+    profiler.enable()
+    monkeypatch.setattr(utils, 'profiler', profiler)
+    utils.process_pep_data(pages_session, utils.parse_pep_list(pages_session))
+    summary = profiler.summary()
+    assert {'fetch', 'parse', 'pep.item'} <= set(
+        summary['stages']
+    )
+    assert summary['counters']['bytes'] > 0
+    profiler.print_summary()
+    assert 'pep.item' in capsys.readouterr().out
@@ -0,0 +1,108 @@
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+try:
+    from src import ratelimit, sessions
+except ModuleNotFoundError:
+    assert False, 'Убедитесь что в директории `src` есть файл `ratelimit.py`'
+except ImportError:
+    assert False, 'Убедитесь что в директории `src` есть файл `ratelimit.py`'
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_token_bucket():
+    clock = FakeClock()
+    bucket = ratelimit.TokenBucket(2, 2, clock=clock)
+    assert [bucket.reserve() for _ in range(4)] == [0, 0, 0.5, 1.0], (
+        'После исчерпания burst запросы должны идти с частотой rate'
+    )
+    clock.now = 10
+    assert bucket.reserve() == 0, 'Ведро не должно копить больше burst'
+    assert bucket.reserve() == 0
+    assert bucket.reserve() == 0.5
+
+
+def test_token_bucket_adapts_rate():
+    bucket = ratelimit.TokenBucket(4, 1, clock=FakeClock())
+    bucket.slow_down()
+    assert bucket.rate == 2
+    for _ in range(100):
+        bucket.slow_down()
+    assert bucket.rate == ratelimit.RATE_MIN
+    for _ in range(100):
+        bucket.speed_up()
+    assert bucket.rate == 4, 'Частота не должна превышать исходную'
+
+
+def test_rate_limiter_hosts():
+    limiter = ratelimit.RateLimiter(
+        {'peps.python.org': (1, 1)}, clock=FakeClock()
+    )
+    url = 'https://peps.python.org/pep-0008/'
+    assert [limiter.reserve(url) for _ in range(3)] == [0, 1, 2]
+    assert limiter.reserve('https://docs.python.org/3/') == 0, (
+        'Хосты без ограничения не должны задерживаться'
+    )
+    limiter.report(url, [200, 429])
+    assert limiter.get_bucket(url).rate == 0.5
+
+
+def test_rate_limiter_default():
+    limiter = ratelimit.RateLimiter(
+        {'peps.python.org': (10, 1), None: (1, 1)}, clock=FakeClock()
+    )
+    assert limiter.get_bucket('https://docs.python.org/3/').rate == 1
+    assert limiter.get_bucket('https://peps.python.org/').rate == 10
+
+
+class TooManyRequestsHandler(BaseHTTPRequestHandler):
+    """Отвечает 429 на первый запрос, затем 200."""
+
+    failures = 0
+
+    def do_GET(self):
+        if type(self).failures:
+            type(self).failures -= 1
+            self.send_response(429)
+            self.send_header('Retry-After', '0')
+            self.end_headers()
+            return
+        self.send_response(200)
+        self.end_headers()
+        self.wfile.write(b'ok')
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def server_url():
+    server = ThreadingHTTPServer(('127.0.0.1', 0), TooManyRequestsHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f'http://127.0.0.1:{server.server_address[1]}/'
+    server.shutdown()
+    server.server_close()
+
+
+def test_rate_limited_adapter(server_url, monkeypatch):
+    delays = []
+    monkeypatch.setattr(ratelimit.time, 'sleep', delays.append)
+    limiter = ratelimit.RateLimiter({None: (4, 1)}, clock=FakeClock())
+    session = sessions.ParserSession(backend='memory')
+    session.mount('http://', sessions.create_adapter(1, 3, limiter))
+    TooManyRequestsHandler.failures = 1
+    assert session.get(server_url).status_code == 200
+    assert limiter.get_bucket(server_url).rate == 2, (
+        'Ответ 429, обработанный повтором, должен снижать частоту запросов'
+    )
+    session.get(server_url + 'next/')
+    assert delays == [0, 0.5]
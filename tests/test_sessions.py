@@ -0,0 +1,207 @@
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+import requests_mock
+try:
+    from src import configs, memo, sessions, utils
+except ModuleNotFoundError:
+    assert False, 'Убедитесь что в директории `src` есть файл `sessions.py`'
+except ImportError:
+    assert False, 'Убедитесь что в директории `src` есть файл `sessions.py`'
+
+PAGE_URL = 'https://peps.python.org/pep-0008/'
+
+
+def mount_etag_adapter(session, requests_headers):
+    def etag_page(request, context):
+        requests_headers.append(request.headers)
+        if request.headers.get('If-None-Match') == '"v1"':
+            context.status_code = 304
+            return ''
+        context.headers['ETag'] = '"v1"'
+        return '<abbr title="x">Active</abbr>'
+
+    adapter = requests_mock.Adapter()
+    adapter.register_uri('GET', PAGE_URL, text=etag_page)
+    session.mount('https://', adapter)
+
+
+def test_revalidation_stats():
+    session = sessions.ParserSession(backend='memory', always_revalidate=True)
+    requests_headers = []
+    mount_etag_adapter(session, requests_headers)
+    for _ in range(3):
+        response = session.get(PAGE_URL)
+        assert response.text == '<abbr title="x">Active</abbr>'
+    assert requests_headers[1]['If-None-Match'] == '"v1"', (
+        'Закешированный ответ должен перепроверяться условным запросом'
+    )
+    assert session.cache_stats == {'miss': 1, 'revalidated': 2}
+
+
+def test_cache_hit_stats():
+    session = sessions.ParserSession(backend='memory')
+    mount_etag_adapter(session, [])
+    session.get(PAGE_URL)
+    session.get(PAGE_URL)
+    assert session.cache_stats == {'miss': 1, 'hit': 1}
+
+
+@pytest.fixture
+def create_session(monkeypatch, tmp_path):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(
+        sessions, 'ExtractionMemo',
+        lambda: memo.ExtractionMemo(tmp_path / 'memo.sqlite3')
+    )
+    parser = configs.configure_argument_parser(['pep'])
+
+    def _create_session(*cli_args):
+        return sessions.create_session(parser.parse_args(['pep', *cli_args]))
+    return _create_session
+
+
+def test_create_session(create_session):
+    session = create_session('--clear-cache', '--revalidate')
+    assert isinstance(session, sessions.ParserSession)
+    assert session.settings.always_revalidate is True
+    assert isinstance(session.memo, memo.ExtractionMemo)
+    assert session.coalescer.duplicates == 0
+    session.close()
+    session = create_session('--clear-cache', '--no-memo')
+    assert session.memo is None
+    session.close()
+
+
+def test_create_session_adapter(create_session):
+    session = create_session(
+        '--workers', '32', '--retries', '5', '--timeout', '2.5'
+    )
+    adapter = session.get_adapter('https://peps.python.org/')
+    assert adapter._pool_maxsize == 32, (
+        'Пул соединений должен вмещать все параллельные загрузки'
+    )
+    assert adapter.max_retries.total == 5
+    assert 503 in adapter.max_retries.status_forcelist
+    assert session.timeout == 2.5
+    session.close()
+
+
+class FlakyHandler(BaseHTTPRequestHandler):
+    """Отвечает 503 с Retry-After на первые запросы, затем 200."""
+
+    failures = 0
+
+    def do_GET(self):
+        if type(self).failures:
+            type(self).failures -= 1
+            self.send_response(503)
+            self.send_header('Retry-After', '0')
+            self.end_headers()
+            return
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/html; charset=utf-8')
+        self.end_headers()
+        self.wfile.write(b'<abbr title="x">Final</abbr>')
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def flaky_url():
+    server = ThreadingHTTPServer(('127.0.0.1', 0), FlakyHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f'http://127.0.0.1:{server.server_address[1]}/pep-0008/'
+    server.shutdown()
+    server.server_close()
+
+
+def test_retry_on_unavailable(flaky_url):
+    session = sessions.ParserSession(backend='memory')
+    session.mount('http://', sessions.create_adapter(1, retries=3))
+    FlakyHandler.failures = 2
+    response = session.get(flaky_url)
+    assert response.status_code == 200, (
+        'Запрос должен повторяться при ответе 503'
+    )
+
+
+def test_retry_exhausted(flaky_url):
+    session = sessions.ParserSession(backend='memory')
+    session.mount('http://', sessions.create_adapter(1, retries=1))
+    FlakyHandler.failures = 5
+    with pytest.raises(utils.RequestError):
+        utils.get_response(session, flaky_url)
+
+
+def test_create_session_rate_limit(create_session):
+    session = create_session('--rate-limit', 'peps.python.org=2')
+    adapter = session.get_adapter('https://peps.python.org/')
+    assert adapter.rate_limiter is session.rate_limiter
+    assert session.rate_limiter.limits == {'peps.python.org': (2.0, 2)}
+    session.close()
+    session = create_session()
+    assert session.rate_limiter is None
+    session.close()
+
+
+class FakeRedis:
+    @staticmethod
+    def from_url(url):
+        fakeredis = pytest.importorskip('fakeredis')
+        return fakeredis.FakeRedis()
+
+
+@pytest.mark.parametrize(
+    'backend', ['sqlite', 'filesystem', 'memory', 'redis']
+)
+def test_create_session_cache_backend(create_session, monkeypatch, backend):
+    monkeypatch.setattr(sessions, 'Redis', FakeRedis)
+    session = create_session('--cache-backend', backend, '--cache-ttl', '60')
+    mount_etag_adapter(session, [])
+    session.get(PAGE_URL)
+    assert session.get(PAGE_URL).from_cache is True, (
+        f'Ответ должен браться из кеша {backend}'
+    )
+    assert session.settings.expire_after == 60
+    if backend != 'memory':
+        assert session.cache.responses.serializer.name == 'zlib', (
+            'По умолчанию ответы в кеше сжимаются zlib'
+        )
+    if backend == 'sqlite':
+        with session.cache.responses.connection() as connection:
+            journal_mode, = connection.execute(
+                'PRAGMA journal_mode'
+            ).fetchone()
+        assert journal_mode == 'wal'
+    session.close()
+
+
+@pytest.mark.parametrize('backend', ['memory', 'sqlite', 'filesystem'])
+def test_evict_cache(backend, tmp_path, monkeypatch):
+    session = sessions.ParserSession(
+        str(tmp_path / 'cache'), backend=backend, cache_max_entries=2
+    )
+    adapter = requests_mock.Adapter()
+    adapter.register_uri('GET', requests_mock.ANY, text='PEP')
+    session.mount('https://', adapter)
+    urls = [f'https://peps.python.org/pep-000{number}/' for number in '123']
+    for url in urls:
+        session.get(url)
+        time.sleep(0.01)
+    if backend != 'memory':
+        monkeypatch.setattr(
+            session.cache.responses, 'deserialize',
+            lambda *args: pytest.fail('Ответы не должны читаться из кеша')
+        )
+    session.evict_cache()
+    monkeypatch.undo()
+    assert not session.cache.contains(url=urls[0]), (
+        'Из кеша удаляются самые старые ответы'
+    )
+    assert all(session.cache.contains(url=url) for url in urls[1:])
+    session.close()
@@ -0,0 +1,163 @@
+from argparse import Namespace
+from pathlib import Path
+
+import pytest
+import requests_mock
+try:
+    from src import (
+        configs, constants, crawler, main, sessions, snapshots, utils
+    )
+except ModuleNotFoundError:
+    assert False, 'Убедитесь что в директории `src` есть файл `snapshots.py`'
+except ImportError:
+    assert False, 'Убедитесь что в директории `src` есть файл `snapshots.py`'
+
+PAGE_URL = 'https://peps.python.org/pep-0008/'
+
+
+def snapshot_args(archive, **options):
+    return Namespace(**{
+        'archive': archive, 'workers': 1, 'engine': 'threads',
+        'incremental': False, 'resume': False, 'parse_workers': 1,
+        'per_pep': False, 'stream_parse': False, **options
+    })
+
+
+def test_archive_roundtrip(tmp_path):
+    path = tmp_path / 'archive' / 'snapshot.sqlite3'
+    body = b'<html>' + b'PEP 8' * 100_000 + b'</html>'
+    with snapshots.SnapshotArchive(path) as archive:
+        archive.add(PAGE_URL, 200, {
+            'Content-Type': 'text/html; charset=utf-8',
+            'Content-Encoding': 'gzip',
+            'Content-Length': '10',
+        }, body)
+        archive.add(PAGE_URL, 200, {'Content-Type': 'text/html'}, body)
+        assert len(archive) == 1
+        assert archive.urls() == [PAGE_URL]
+    assert path.stat().st_size < len(body), 'Тела ответов должны сжиматься'
+    with snapshots.SnapshotArchive(path, readonly=True) as archive:
+        assert archive.get(PAGE_URL) == (200, {
+            'Content-Type': 'text/html', 'Content-Length': str(len(body)),
+        }, body)
+        assert archive.get(PAGE_URL + 'missing/') is None
+
+
+def test_archive_readonly_missing(tmp_path):
+    with pytest.raises(RuntimeError, match='Архив снимка не найден'):
+        snapshots.SnapshotArchive(tmp_path / 'missing.sqlite3', readonly=True)
+
+
+def test_replay_session(replay_session):
+    response = utils.get_response(replay_session, PAGE_URL)
+    assert response.status_code == 200
+    assert response.encoding == 'utf-8'
+    assert utils.extract_pep_status(response.content) == 'Active'
+    with pytest.raises(utils.RequestError, match='Ссылки нет в архиве'):
+        utils.get_response(replay_session, PAGE_URL + 'missing/')
+
+
+def test_replay_redirect(tmp_path, tempfile_session):
+    path = tmp_path / 'snapshot.sqlite3'
+    adapter = requests_mock.Adapter()
+    adapter.register_uri(
+        'GET', 'https://peps.python.org/pep-8/',
+        status_code=301, headers={'Location': PAGE_URL}
+    )
+    adapter.register_uri('GET', PAGE_URL, text='PEP 8')
+    tempfile_session.mount('https://', adapter)
+    with snapshots.SnapshotArchive(path) as archive:
+        tempfile_session.hooks['response'].append(archive.record)
+        tempfile_session.get('https://peps.python.org/pep-8/')
+        assert archive.urls() == [PAGE_URL, 'https://peps.python.org/pep-8/']
+        tempfile_session.hooks['response'].remove(archive.record)
+
+    tempfile_session.mount('https://', snapshots.ReplayAdapter(
+        snapshots.SnapshotArchive(path, readonly=True)
+    ))
+    tempfile_session.cache.clear()
+    response = tempfile_session.get('https://peps.python.org/pep-8/')
+    assert response.url == PAGE_URL
+    assert [r.status_code for r in response.history] == [301]
+    assert response.text == 'PEP 8'
+    tempfile_session.close()
+
+
+def test_snapshot_and_replay(monkeypatch, tmp_path, pages_session):
+    monkeypatch.setattr(main, 'BASE_DIR', Path(tmp_path))
+    monkeypatch.setattr(main, 'save_to_csv', lambda *args, **kwargs: None)
+    path = tmp_path / 'snapshot.sqlite3'
+    modes = main.resolve_modes(['all'])
+    adapter = pages_session.get_adapter(PAGE_URL)
+    send, streamed = adapter.send, []
+
+    def spy_send(request, **kwargs):
+        if kwargs.get('stream') and not request.url.endswith('.zip'):
+            streamed.append(request.url)
+        return send(request, **kwargs)
+
+    monkeypatch.setattr(adapter, 'send', spy_send)
+    main.snapshot(pages_session, modes, snapshot_args(
+        path, engine='async', incremental=True, resume=True,
+        stream_parse=True
+    ))
+    assert not streamed, 'Снимок загружает страницы целиком, без потока'
+    assert not pages_session.hooks['response'], (
+        'После снимка запись ответов в архив должна отключаться'
+    )
+
+    expected = {
+        mode: main.run_mode(pages_session, mode, snapshot_args(path))
+        for mode in ('whats-new', 'latest-versions', 'pep')
+    }
+    with snapshots.SnapshotArchive(path, readonly=True) as archive:
+        urls = archive.urls()
+    assert 'https://peps.python.org/' in urls
+    assert PAGE_URL in urls
+    assert (
+        'https://docs.python.org/3/archives/python-3.12.3-docs-pdf-a4.zip'
+        in urls
+    )
+
+    pages_session.mount('https://', snapshots.ReplayAdapter(
+        snapshots.SnapshotArchive(path, readonly=True)
+    ))
+    pages_session.cache.clear()
+    for mode, rows in expected.items():
+        got = main.run_mode(pages_session, mode, snapshot_args(path))
+        assert list(got) == list(rows), (
+            f'Режим {mode} должен давать из архива те же строки'
+        )
+    pages_session.close()
+
+
+def test_replay_parsers(parser_backend, replay_session, pages_session):
+    assert main.whats_new(replay_session) == main.whats_new(pages_session), (
+        'Страницы из архива должны разбираться всеми библиотеками разбора'
+    )
+
+
+def test_create_session_replay(monkeypatch, tmp_path, snapshot_path):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(sessions, 'ExtractionMemo', lambda: None)
+    parser = configs.configure_argument_parser(['pep', 'snapshot'])
+    args = parser.parse_args(['snapshot'])
+    assert args.archive == constants.SNAPSHOT_PATH
+    args = parser.parse_args(['pep', '--replay', str(snapshot_path)])
+    session = sessions.create_session(args)
+    assert type(session.get_adapter(PAGE_URL)).__name__ == 'ReplayAdapter'
+    assert session.cache.__class__.__name__ == 'BaseCache', (
+        'При воспроизведении HTTP-кеш должен храниться в памяти'
+    )
+    got = list(crawler.crawl(
+        session, [PAGE_URL], utils.get_content, utils.extract_pep_status,
+        engine='async'
+    ))
+    assert got == [(PAGE_URL, 'Active', None)], (
+        'При воспроизведении асинхронный движок заменяется потоковым'
+    )
+    session.close()
+
+    args = parser.parse_args(['pep', '--replay', str(tmp_path / 'missing')])
+    with pytest.raises(RuntimeError, match='Архив снимка не найден'):
+        sessions.create_session(args)
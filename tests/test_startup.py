@@ -0,0 +1,27 @@
+import pytest
+
+from bench import startup
+
+HEAVY_MODULES = set(startup.HEAVY_MODULES)
+
+
+@pytest.mark.parametrize('target, expected', [
+    ('help', set()),
+    ('latest-versions', {'bs4', 'requests', 'requests_cache'}),
+    ('whats-new', {'bs4', 'requests', 'requests_cache', 'tqdm'}),
+    ('download', {'bs4', 'requests', 'requests_cache', 'tqdm'}),
+    ('pep', {'requests', 'requests_cache', 'tqdm'}),
+])
+def test_startup_imports(target, expected):
+    imports = startup.measure_imports(target)
+    assert (HEAVY_MODULES - {'lxml'}) & set(imports) == expected, (
+        f'Запуск {target} должен импортировать только нужные ему '
+        'тяжёлые зависимости'
+    )
+    assert startup.total_import_ms(imports) > 0
+
+
+def test_startup_imports_pretty_output():
+    imports = startup.measure_imports('latest-versions', output='pretty')
+    assert 'prettytable' in imports
+    assert 'tqdm' not in imports and 'aiohttp' not in imports
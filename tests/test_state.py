@@ -0,0 +1,51 @@
+import sqlite3
+
+try:
+    from src import state
+except ModuleNotFoundError:
+    assert False, 'Убедитесь что в директории `src` есть файл `state.py`'
+except ImportError:
+    assert False, 'Убедитесь что в директории `src` есть файл `state.py`'
+
+
+def test_pep_state_roundtrip(tmp_path):
+    pep_state = state.PepState(tmp_path / 'state' / 'pep.sqlite3')
+    assert pep_state.load() == {}
+    statuses = {
+        state.PepRecord(
+            '8', 'https://peps.python.org/pep-0008/', 'P', 'A'
+        ): 'Active',
+        state.PepRecord(
+            '736', 'https://peps.python.org/pep-0736/', 'S', ''
+        ): 'Draft',
+    }
+    pep_state.save(statuses)
+    assert pep_state.load() == statuses
+    final = state.PepRecord('8', 'https://peps.python.org/pep-0008/', 'P', 'F')
+    pep_state.save({final: 'Final'})
+    assert pep_state.load() == {final: 'Final'}, (
+        'Сохранение должно заменять прежнее состояние'
+    )
+
+
+def test_pep_state_adds_type_letter(tmp_path):
+    path = tmp_path / 'pep.sqlite3'
+    connection = sqlite3.connect(path)
+    with connection:
+        connection.execute(
+            'CREATE TABLE peps (second_letter TEXT, pep_number TEXT, '
+            'pep_url TEXT, status TEXT, '
+            'PRIMARY KEY (pep_number, second_letter, pep_url))'
+        )
+        connection.execute(
+            "INSERT INTO peps VALUES ('A', '8', 'https://peps.python.org/"
+            "pep-0008/', 'Active')"
+        )
+    connection.close()
+    pep_state = state.PepState(path)
+    assert pep_state.load() == {
+        ('8', 'https://peps.python.org/pep-0008/', '', 'A'): 'Active'
+    }, 'Состояние прежнего формата должно читаться без буквы типа'
+    record = state.PepRecord('8', 'https://peps.python.org/pep-0008/', 'P', 'A')
+    pep_state.save({record: 'Active'})
+    assert pep_state.load() == {record: 'Active'}
@@ -2,7 +2,7 @@ import pytest
 import requests
 import requests_mock
 import bs4
-from conftest import MAIN_DOC_URL
+from conftest import MAIN_DOC_URL, PAGES_DIR
 try:
     from src import utils
 except ModuleNotFoundError:
@@ -54,3 +54,470 @@ def test_get_response(mock_session):
             'делает запрос к странице и возвращает ответ. \n'
             'Кстати: You are breathtaken!'
         )
+
+
+def test_process_pep_data(pages_session):
+    pep_links = utils.parse_pep_list(pages_session)
+    got = utils.process_pep_data(pages_session, pep_links)
+    assert got == {
+        'Active': 4, 'Final': 3, 'Accepted': 1, 'Draft': 1,
+        'Superseded': 1, 'Withdrawn': 1, 'Rejected': 1, 'April Fool!': 1,
+        'Total': 13,
+    }, (
+        'Функция `process_pep_data` должна посчитать статусы '
+        'из карточек PEP'
+    )
+
+
+def test_process_pep_data_workers(pages_session, caplog):
+    pep_links = utils.parse_pep_list(pages_session)
+    sequential = utils.process_pep_data(pages_session, pep_links)
+    sequential_log = caplog.text
+    caplog.clear()
+    concurrent = utils.process_pep_data(pages_session, pep_links, workers=4)
+    assert concurrent == sequential, (
+        'Параллельная обработка PEP должна давать те же статусы, '
+        'что и последовательная'
+    )
+    assert list(concurrent) == list(sequential)
+    assert 'pep-0401' in caplog.text
+    assert caplog.text.count('Ожидаемые статусы') == (
+        sequential_log.count('Ожидаемые статусы')
+    )
+
+
+@pytest.mark.parametrize('html, status', [
+    ('<dl><dd><abbr title="Accepted and complete">Final</abbr></dd></dl>',
+     'Final'),
+    ('<abbr>PEP</abbr><abbr class="x" title="y"> April Fool! </abbr>',
+     'April Fool!'),
+    ('<abbr title="y"><span>Draft</span></abbr>', 'Draft'),
+    ('<abbr title="y">Rock &amp; Roll</abbr>', 'Rock & Roll'),
+    ('<p>No status here</p>', None),
+    ('<abbr title="x"><span>Draft</span></abbr> '
+     '<abbr title="y">Final</abbr>', 'Draft'),
+    ('<!-- <abbr title="old">Old</abbr> --><abbr title="y">Final</abbr>',
+     'Final'),
+    ('<abbr title="a>b">Final</abbr>', 'Final'),
+    ("<abbr data-x='title=' lang=\"en\">PEP</abbr><abbr title>Final</abbr>",
+     'Final'),
+])
+def test_extract_pep_status(html, status):
+    assert utils.extract_pep_status(html) == status
+
+
+def test_extract_pep_status_matches_full_tree():
+    pages = PAGES_DIR.glob('peps.python.org/pep-*/index.html')
+    for page in pages:
+        html = page.read_text(encoding='utf-8')
+        assert utils.extract_pep_status(html) == utils.find_pep_status(
+            bs4.BeautifulSoup(html, 'lxml')
+        ), f'Быстрый путь должен совпадать с полным разбором для {page}'
+
+
+def test_extract_from_bytes():
+    for page in PAGES_DIR.glob('peps.python.org/pep-*/index.html'):
+        body = page.read_bytes()
+        assert utils.extract_pep_status(body) == utils.extract_pep_status(
+            body.decode('utf-8')
+        ), f'Разбор байтов должен совпадать с разбором строки для {page}'
+    assert utils.extract_pep_status(
+        '<abbr title="y">Ещё обсуждается</abbr>'.encode('utf-8')
+    ) == 'Ещё обсуждается'
+    soup = utils.parse_html('<h1>Что нового</h1>'.encode('utf-8'))
+    assert soup.find('h1').text == 'Что нового'
+
+
+ARCHIVE_URL = MAIN_DOC_URL + 'archives/python-docs-pdf-a4.zip'
+ARCHIVE = bytes(range(256)) * 1024
+
+
+def mount_archive(session, **response):
+    adapter = requests_mock.Adapter()
+    adapter.register_uri('GET', ARCHIVE_URL, **response)
+    session.mount('https://', adapter)
+
+
+def test_download_file(tmp_path, tempfile_session):
+    archive_path = tmp_path / 'python-docs-pdf-a4.zip'
+    cache_enabled = []
+
+    def archive(request, context):
+        cache_enabled.append(not tempfile_session.settings.disabled)
+        return ARCHIVE
+
+    mount_archive(tempfile_session, content=archive)
+    utils.download_file(
+        tempfile_session, ARCHIVE_URL, archive_path, chunk_size=1000
+    )
+    assert archive_path.read_bytes() == ARCHIVE
+    assert cache_enabled == [True], (
+        'Загрузка архива не должна отключать HTTP-кеш всей сессии: '
+        'им пользуются другие потоки'
+    )
+    assert list(tmp_path.iterdir()) == [archive_path], (
+        'После загрузки временный файл .part должен быть переименован'
+    )
+    assert not tempfile_session.cache.contains(url=ARCHIVE_URL), (
+        'Архив не должен сохраняться в HTTP-кеш'
+    )
+
+
+def write_part(tmp_path, data, validator='"v1"'):
+    part_path = tmp_path / 'python-docs-pdf-a4.zip.part'
+    part_path.write_bytes(data)
+    if validator:
+        (tmp_path / 'python-docs-pdf-a4.zip.part.validator').write_text(
+            validator
+        )
+    return part_path
+
+
+def test_download_file_resume(tmp_path, tempfile_session):
+    archive_path = tmp_path / 'python-docs-pdf-a4.zip'
+    part_path = write_part(tmp_path, ARCHIVE[:1000])
+
+    def partial_content(request, context):
+        assert request.headers['Range'] == 'bytes=1000-'
+        assert request.headers['If-Range'] == '"v1"'
+        context.status_code = 206
+        context.headers['Content-Range'] = (
+            f'bytes 1000-{len(ARCHIVE) - 1}/{len(ARCHIVE)}'
+        )
+        return ARCHIVE[1000:]
+
+    mount_archive(tempfile_session, content=partial_content)
+    utils.download_file(tempfile_session, ARCHIVE_URL, archive_path)
+    assert archive_path.read_bytes() == ARCHIVE
+    assert list(tmp_path.iterdir()) == [archive_path]
+
+
+def test_download_file_checks_size(tmp_path, tempfile_session):
+    archive_path = tmp_path / 'python-docs-pdf-a4.zip'
+    mount_archive(
+        tempfile_session, content=ARCHIVE[:1000],
+        headers={'Content-Length': str(len(ARCHIVE))},
+    )
+    with pytest.raises(requests.RequestException):
+        utils.download_file(tempfile_session, ARCHIVE_URL, archive_path)
+    assert list(tmp_path.iterdir()) == [], (
+        'Файл, размер которого не совпал с Content-Length, не публикуется'
+    )
+
+
+@pytest.mark.parametrize('headers, validator', [
+    ({'ETag': '"v1"', 'Last-Modified': 'Mon, 01 Jan 2024'}, '"v1"'),
+    ({'ETag': 'W/"v1"', 'Last-Modified': 'Mon, 01 Jan 2024'},
+     'Mon, 01 Jan 2024'),
+    ({'ETag': 'W/"v1"'}, None),
+])
+def test_save_validator(tmp_path, headers, validator):
+    path = tmp_path / 'archive.zip.part.validator'
+    path.write_text('"old"')
+    utils.save_validator(path, headers)
+    assert (path.read_text() if path.exists() else None) == validator
+
+
+def test_download_file_changed_on_server(tmp_path, tempfile_session):
+    archive_path = tmp_path / 'python-docs-pdf-a4.zip'
+    write_part(tmp_path, b'old archive')
+
+    def changed(request, context):
+        assert request.headers['If-Range'] == '"v1"'
+        context.headers['ETag'] = '"v2"'
+        return ARCHIVE
+
+    mount_archive(tempfile_session, content=changed)
+    utils.download_file(tempfile_session, ARCHIVE_URL, archive_path)
+    assert archive_path.read_bytes() == ARCHIVE, (
+        'Если файл на сервере изменился, он скачивается заново'
+    )
+
+
+@pytest.mark.parametrize('extra', [b'', b'extra'])
+def test_download_file_range_not_satisfiable(
+    tmp_path, tempfile_session, extra
+):
+    archive_path = tmp_path / 'python-docs-pdf-a4.zip'
+    write_part(tmp_path, ARCHIVE + extra)
+
+    def archive(request, context):
+        if 'Range' in request.headers:
+            context.status_code = 416
+            context.headers['Content-Range'] = f'bytes */{len(ARCHIVE)}'
+            return b''
+        return ARCHIVE
+
+    mount_archive(tempfile_session, content=archive)
+    utils.download_file(tempfile_session, ARCHIVE_URL, archive_path)
+    assert archive_path.read_bytes() == ARCHIVE, (
+        'При ответе 416 .part публикуется, только если его размер совпадает '
+        'с размером файла на сервере, иначе файл скачивается заново'
+    )
+
+
+def test_download_file_range_ignored(tmp_path, tempfile_session):
+    archive_path = tmp_path / 'python-docs-pdf-a4.zip'
+    write_part(tmp_path, b'stale')
+    mount_archive(tempfile_session, content=ARCHIVE)
+    utils.download_file(tempfile_session, ARCHIVE_URL, archive_path)
+    assert archive_path.read_bytes() == ARCHIVE, (
+        'Если сервер не поддерживает Range, файл скачивается заново'
+    )
+
+
+def test_download_file_keeps_part_on_error(tmp_path, tempfile_session):
+    archive_path = tmp_path / 'python-docs-pdf-a4.zip'
+    part_path = write_part(tmp_path, ARCHIVE[:1000])
+    mount_archive(tempfile_session, status_code=500)
+    with pytest.raises(requests.HTTPError):
+        utils.download_file(tempfile_session, ARCHIVE_URL, archive_path)
+    assert not archive_path.exists()
+    assert part_path.read_bytes() == ARCHIVE[:1000], (
+        'При ошибке загрузки .part должен сохраняться для докачки'
+    )
+
+
+def test_process_pep_data_incremental(pages_session, tmp_path):
+    from src.state import PepState
+    pep_state = PepState(tmp_path / 'pep.sqlite3')
+    pep_links = utils.parse_pep_list(pages_session)
+    full = utils.process_pep_data(pages_session, pep_links, state=pep_state)
+
+    changed_link = pep_links[0]
+    pep_links[0] = changed_link._replace(status_letter='W')
+    requested = []
+    pages_session.hooks['response'].append(
+        lambda response, *args, **kwargs: requested.append(response.url)
+    )
+    got = utils.process_pep_data(pages_session, pep_links, state=pep_state)
+    assert requested == [changed_link.url], (
+        'В инкрементальном режиме загружаются только изменившиеся PEP'
+    )
+    assert got == full
+    assert len(pep_state.load()) == len(pep_links)
+
+
+def test_process_pep_data_request_errors(pages_session, caplog):
+    pep_links = utils.parse_pep_list(pages_session)
+    missing_url = 'https://peps.python.org/pep-9999/'
+    pages_session.get_adapter(missing_url).register_uri(
+        'GET', missing_url, status_code=404
+    )
+    got = utils.process_pep_data(
+        pages_session,
+        pep_links + [utils.PepRecord('9999', missing_url, 'S', '')],
+        workers=2
+    )
+    assert got['Total'] == 13, (
+        'Ошибка загрузки одной карточки не должна прерывать обработку'
+    )
+    assert missing_url in caplog.text
+
+
+def test_process_pep_data_resume(pages_session, tmp_path):
+    from src.checkpoints import Checkpoint
+    path = tmp_path / 'pep.jsonl'
+    pep_links = utils.parse_pep_list(pages_session)
+    full = utils.process_pep_data(pages_session, pep_links)
+    failed_url = pep_links[0].url
+    adapter = pages_session.get_adapter(failed_url)
+    adapter.register_uri('GET', failed_url, status_code=503)
+    pages_session.cache.clear()
+    with Checkpoint(path) as checkpoint:
+        utils.process_pep_data(pages_session, pep_links, checkpoint=checkpoint)
+    assert path.exists(), 'Контрольная точка сохраняется при ошибках'
+
+    page = PAGES_DIR / 'peps.python.org' / failed_url.split('/')[-2]
+    adapter.register_uri(
+        'GET', failed_url, content=(page / 'index.html').read_bytes()
+    )
+    requested = []
+    pages_session.hooks['response'].append(
+        lambda response, *args, **kwargs: requested.append(response.url)
+    )
+    with Checkpoint(path, resume=True) as checkpoint:
+        got = utils.process_pep_data(
+            pages_session, pep_links, checkpoint=checkpoint
+        )
+    assert set(requested) == {failed_url}, (
+        'С --resume загружаются только необработанные PEP'
+    )
+    assert got == full
+    assert not path.exists(), 'После успешного обхода точка удаляется'
+
+
+def test_process_pep_data_parse_workers(pages_session):
+    pep_links = utils.parse_pep_list(pages_session)
+    assert utils.process_pep_data(
+        pages_session, pep_links, parse_workers=2
+    ) == utils.process_pep_data(pages_session, pep_links)
+
+
+def test_process_pep_data_rows(pages_session):
+    pep_links = utils.parse_pep_list(pages_session)
+    pep_rows = []
+    counts = utils.process_pep_data(
+        pages_session, pep_links, pep_rows=pep_rows
+    )
+    assert len(pep_rows) == counts['Total'] == 13
+    assert [row[0] for row in pep_rows] == [
+        int(pep_link.number) for pep_link in pep_links
+    ]
+    mismatched = [row for row in pep_rows if row[4]]
+    assert [row[0] for row in mismatched] == [401]
+    assert mismatched[0][3] == 'April Fool!'
+
+
+def test_get_response_coalescer(pages_session):
+    from src.coalescing import RequestCoalescer
+
+    pages_session.coalescer = RequestCoalescer()
+    requested = []
+    pages_session.hooks['response'].append(
+        lambda response, *args, **kwargs: requested.append(response.url)
+    )
+    pep_links = utils.parse_pep_list(pages_session)
+    duplicated = pep_links + pep_links[:3] + pep_links[:3]
+    got = utils.process_pep_data(pages_session, duplicated, workers=4)
+    assert got['Total'] == len(duplicated)
+    assert len(set(requested)) == len(pep_links) + 1
+    assert pages_session.coalescer.duplicates == 3, (
+        'Повторно запрошенные ссылки должны отдаваться из памяти'
+    )
+
+
+def test_stream_pep_status(pages_session):
+    pep_links = utils.parse_pep_list(pages_session)
+    streamed = [
+        utils.stream_pep_status(pages_session, pep_link.url)
+        for pep_link in pep_links
+    ]
+    assert not any(
+        'pep-' in url for url in pages_session.cache.urls()
+    ), 'Потоковая загрузка не должна сохранять оборванные страницы в кеш'
+    assert streamed == [
+        utils.get_pep_status(pages_session, pep_link.url)
+        for pep_link in pep_links
+    ]
+    assert utils.process_pep_data(
+        pages_session, pep_links, stream_parse=True
+    )['Total'] == 13
+
+
+def test_extract_pep_records():
+    html = (PAGES_DIR / 'peps.python.org' / 'index.html').read_bytes()
+    records = utils.extract_pep_records(html)
+    assert records[0] == utils.PepRecord(
+        '1', 'https://peps.python.org/pep-0001/', 'P', 'A'
+    )
+    assert all(isinstance(record, utils.PepRecord) for record in records)
+    assert '0' not in {record.number for record in records}
+    soup = bs4.BeautifulSoup(html, 'lxml')
+    section = soup.find('section', attrs={'id': 'index-by-category'})
+    assert len(records) == len([
+        row for row in section.find_all('tr')
+        if row.find('td') and row.find_all('td')[1].text.strip() != '0'
+    ]), 'Должны извлекаться все строки раздела index-by-category'
+    with pytest.raises(utils.ParserFindTagException):
+        utils.extract_pep_records(b'<html><body><table></table></body></html>')
+
+
+def test_extract_pep_records_without_link():
+    html = (
+        b'<section id="index-by-category"><table>'
+        b'<tr><td><abbr>SA</abbr></td><td>9</td></tr>'
+        b'<tr><td><abbr>SA</abbr></td><td><a>10</a></td></tr>'
+        b'<tr><td><abbr>IF</abbr></td>'
+        b'<td><a href="pep-0011/">11</a></td></tr>'
+        b'</table></section>'
+    )
+    assert utils.extract_pep_records(html) == [utils.PepRecord(
+        '11', 'https://peps.python.org/pep-0011/', 'I', 'F'
+    )], 'Строки без ссылки на карточку PEP пропускаются'
+
+
+CP1251_PEP = (
+    '<html><body><dl><dt>Status:</dt><dd>'
+    '<abbr title="Принят">Принят</abbr></dd></dl></body></html>'
+).encode('cp1251')
+
+
+@pytest.mark.parametrize('html, encoding', [
+    (b'<meta charset="windows-1251">', 'cp1251'),
+    (b'<meta http-equiv="Content-Type" '
+     b'content="text/html; charset=ISO-8859-1">', 'iso8859-1'),
+    (b'<meta charset="no-such-charset">', 'utf-8'),
+    (b'<html></html>', 'utf-8'),
+])
+def test_sniff_encoding(html, encoding):
+    from src import parsers
+
+    assert parsers.sniff_encoding(html) == encoding
+
+
+def test_declared_charset(tempfile_session):
+    url = 'https://peps.python.org/pep-9999/'
+    adapter = requests_mock.Adapter()
+    adapter.register_uri('GET', url, content=CP1251_PEP, headers={
+        'Content-Type': 'text/html; charset=windows-1251'
+    })
+    tempfile_session.mount('https://', adapter)
+    response = utils.get_response(tempfile_session, url)
+    assert response.encoding == 'windows-1251', (
+        'Кодировка из заголовка Content-Type не должна подменяться'
+    )
+    assert utils.get_pep_status(tempfile_session, url) == 'Принят'
+    assert utils.get_soup(tempfile_session, url).find('abbr').text == 'Принят'
+    assert [
+        element.text
+        for element in utils.iter_page_elements(tempfile_session, url, 'abbr')
+    ] == ['Принят']
+
+
+def test_extract_pep_status_meta_charset():
+    html = b'<meta charset="windows-1251">' + CP1251_PEP
+    assert utils.extract_pep_status(html) == 'Принят'
+    assert utils.extract_pep_status(CP1251_PEP, encoding='cp1251') == 'Принят'
+
+
+def test_crawl_declared_charset(tempfile_session):
+    url = 'https://peps.python.org/pep-9999/'
+    adapter = requests_mock.Adapter()
+    adapter.register_uri('GET', url, content=CP1251_PEP, headers={
+        'Content-Type': 'text/html; charset=windows-1251'
+    })
+    tempfile_session.mount('https://', adapter)
+    got = list(utils.crawl(
+        tempfile_session, [url], utils.get_content, utils.extract_pep_status
+    ))
+    assert got == [(url, 'Принят', None)], (
+        'Обход должен учитывать кодировку из заголовка Content-Type'
+    )
+    assert utils.stream_pep_status(tempfile_session, url) == 'Принят', (
+        'Страница из HTTP-кеша разбирается в кодировке из заголовка'
+    )
+
+
+def test_extract_pep_status_bad_bytes():
+    html = b'<abbr title="Status">Act\xffive</abbr>'
+    assert utils.extract_pep_status(html) == 'Act\ufffdive'
+
+
+def test_stream_keeps_session_cache(tempfile_session):
+    url = 'https://peps.python.org/pep-0008/'
+    cache_enabled = []
+
+    def page(request, context):
+        cache_enabled.append(not tempfile_session.settings.disabled)
+        return b'<abbr title="Status">Active</abbr>'
+
+    adapter = requests_mock.Adapter()
+    adapter.register_uri('GET', url, content=page)
+    tempfile_session.mount('https://', adapter)
+    assert utils.stream_pep_status(tempfile_session, url) == 'Active'
+    assert cache_enabled == [True], (
+        'Потоковая загрузка не должна отключать HTTP-кеш всей сессии: '
+        'им пользуются другие потоки'
+    )
+    assert not tempfile_session.cache.contains(url=url)